@@ -5,7 +5,17 @@ ssl._create_default_https_context = ssl._create_unverified_context
 
 # Standard library imports
 import glob
-from datetime import datetime, timedelta
+import hashlib
+import json
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict, deque
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import count
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 import time
 from random import uniform
 import warnings
@@ -16,11 +26,14 @@ import certifi
 # Third-party imports
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import gspread
+from gspread.utils import a1_to_rowcol, numericise_all, rowcol_to_a1
 from oauth2client.service_account import ServiceAccountCredentials
 from google.oauth2 import service_account
 import streamlit.components.v1 as components
+from pos_ingestao import TAMANHO_BLOCO_EXCEL, ler_blocos_pos, processar_arquivo_pos
 
 pd.options.mode.chained_assignment = None  # Desabilita o aviso
 
@@ -108,9 +121,127 @@ def get_google_sheets_client():
         st.error(f"Erro ao conectar com Google Sheets: {str(e)}")
         return None
 
+class WorksheetRegistry:
+    """
+    Registro das abas da planilha compartilhado por todo o processo.
+    
+    As abas são resolvidas uma única vez pelos gids de SHEET_GIDS e os cabeçalhos
+    ficam em memória, sendo relidos apenas quando uma divergência é detectada.
+    Cada consulta à API reserva uma leitura no controlador de cota (fora da
+    trava do registro) e lança CotaIndisponivel se a cota estiver esgotada.
+    Não utiliza funções de interface do Streamlit, podendo ser usado fora da sessão.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._headers = {}
+
+    def _reservar_leitura(self, custo: int = 1):
+        """Reserva no controlador de cota as leituras de metadados que serão feitas."""
+        if not get_controlador_cota().adquirir("leitura", custo=custo):
+            raise CotaIndisponivel("Limite de requisições ao Google Sheets atingido.")
+
+    def spreadsheet(self):
+        """Retorna a planilha, abrindo-a apenas na primeira chamada."""
+        if self._spreadsheet is None:
+            self._reservar_leitura()
+        with self._lock:
+            if self._spreadsheet is None:
+                client = get_google_sheets_client()
+                if client is None:
+                    raise ConnectionError("Erro ao conectar com Google Sheets. Tente novamente mais tarde.")
+                self._spreadsheet = client.open_by_key(SHEET_ID)
+            return self._spreadsheet
+
+    def worksheet(self, sheet_name: str):
+        """Retorna a aba pelo nome, resolvendo todas as abas pelos gids na primeira chamada."""
+        planilha = self.spreadsheet()
+        if sheet_name not in self._worksheets:
+            # Aba fora de SHEET_GIDS exige uma segunda leitura, pelo nome
+            self._reservar_leitura(1 if sheet_name in SHEET_GIDS else 2)
+        with self._lock:
+            if sheet_name not in self._worksheets:
+                # Uma única leitura de metadados resolve todas as abas conhecidas
+                worksheets_por_gid = {str(ws.id): ws for ws in planilha.worksheets()}
+                for nome, gid in SHEET_GIDS.items():
+                    if gid in worksheets_por_gid:
+                        self._worksheets[nome] = worksheets_por_gid[gid]
+                
+                # Aba fora de SHEET_GIDS ou com gid alterado: buscar pelo nome
+                if sheet_name not in self._worksheets:
+                    self._worksheets[sheet_name] = planilha.worksheet(sheet_name)
+            return self._worksheets[sheet_name]
+
+    def headers(self, sheet_name: str, refresh: bool = False) -> list:
+        """Retorna o cabeçalho da aba, relendo a primeira linha apenas se necessário."""
+        with self._lock:
+            if not refresh and sheet_name in self._headers:
+                return list(self._headers[sheet_name])
+        
+        worksheet = self.worksheet(sheet_name)
+        self._reservar_leitura()
+        cabecalho = worksheet.row_values(1)
+        with self._lock:
+            self._headers[sheet_name] = cabecalho
+        return list(cabecalho)
+
+    def set_headers(self, sheet_name: str, headers: list):
+        """Registra um cabeçalho já conhecido (por exemplo, vindo de uma leitura em lote)."""
+        with self._lock:
+            self._headers[sheet_name] = list(headers)
+
+    def invalidate_headers(self, sheet_name: str):
+        """Descarta o cabeçalho de uma aba, para que seja relido antes da próxima escrita."""
+        with self._lock:
+            self._headers.pop(sheet_name, None)
+
+    def invalidate(self, sheet_name: str = None):
+        """Descarta as abas e cabeçalhos em cache para forçar nova resolução."""
+        with self._lock:
+            if sheet_name:
+                self._worksheets.pop(sheet_name, None)
+                self._headers.pop(sheet_name, None)
+            else:
+                self._spreadsheet = None
+                self._worksheets.clear()
+                self._headers.clear()
+
+@st.cache_resource
+def get_worksheet_registry() -> WorksheetRegistry:
+    return WorksheetRegistry()
+
+class VersoesAbas:
+    """
+    Contador de versão por aba, compartilhado por todas as sessões.
+    
+    Toda escrita em uma aba incrementa a sua versão. Os caches de dados usam a
+    versão como chave, de modo que uma escrita invalida apenas a aba alterada.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versoes = {}
+
+    def versao(self, sheet_name: str) -> int:
+        with self._lock:
+            return self._versoes.get(sheet_name, 0)
+
+    def incrementar(self, sheet_name: str) -> int:
+        with self._lock:
+            self._versoes[sheet_name] = self._versoes.get(sheet_name, 0) + 1
+            return self._versoes[sheet_name]
+
+@st.cache_resource
+def get_versoes_abas() -> VersoesAbas:
+    return VersoesAbas()
+
+def versao_aba(sheet_name: str) -> int:
+    """Retorna a versão atual dos dados de uma aba."""
+    return get_versoes_abas().versao(sheet_name)
+
 def get_worksheet(sheet_name: str):
     """
-    Get specific worksheet from Google Sheets with retry mechanism.
+    Get specific worksheet from Google Sheets (resolved once by the registry).
     
     Args:
         sheet_name: Nome da aba da planilha
@@ -118,441 +249,2232 @@ def get_worksheet(sheet_name: str):
     Returns:
         gspread.Worksheet or None: Worksheet object or None if error occurs
     """
-    def _get_worksheet():
-        try:
-            client = get_google_sheets_client()
-            if client is None:
-                st.error("Erro ao conectar com Google Sheets. Tente novamente mais tarde.")
-                return None
-                
-            spreadsheet = client.open_by_key(SHEET_ID)
-            worksheet = spreadsheet.worksheet(sheet_name)
-            return worksheet
-        except Exception as e:
-            if "Quota exceeded" in str(e):
-                raise e  # Re-raise quota errors to trigger retry
+    try:
+        return get_worksheet_registry().worksheet(sheet_name)
+    except Exception as e:
+        if _erro_de_cota(e):
+            if not isinstance(e, CotaIndisponivel):
+                get_controlador_cota().registrar_cota_excedida(TEMPO_BLOQUEIO_COTA)
+            st.warning("Limite de requisições ao Google Sheets atingido. Tente novamente em instantes.")
+        else:
             st.error(f"Erro ao acessar planilha {sheet_name}: {str(e)}")
-            return None
+        return None
+
+# Cota do Google Sheets por minuto para a conta de serviço
+COTA_LEITURAS_MINUTO = 60
+COTA_ESCRITAS_MINUTO = 60
+RESERVA_BAIXA_PRIORIDADE = 0.25  # fração da cota preservada para chamadas não adiáveis
+TEMPO_MAXIMO_ESPERA_COTA = 5  # segundos que uma requisição do usuário aguarda na fila
+TEMPO_BLOQUEIO_COTA = 30  # segundos sem chamadas após a API recusar por cota
+
+class CotaIndisponivel(Exception):
+    """A cota local esgotou antes da chamada: nada foi enviado à API."""
+
+def _erro_de_cota(e: Exception) -> bool:
+    """Indica se a exceção corresponde a um limite de cota (da API ou do controlador local)."""
+    if isinstance(e, CotaIndisponivel):
+        return True
+    resposta = getattr(e, "response", None)
+    return "Quota exceeded" in str(e) or getattr(resposta, "status_code", None) == 429
+
+class ControladorCota:
+    """
+    Controlador de cota (token bucket) compartilhado por todas as sessões.
+    
+    Cada leitura ou escrita consome uma ficha do respectivo balde, reposto
+    continuamente até a cota por minuto. Chamadas de baixa prioridade
+    (atualizações que podem usar dados em cache) são descartadas quando o
+    saldo cai abaixo da reserva; as demais aguardam na fila por um tempo
+    limitado. Quando a API recusa uma chamada por cota, todas as chamadas
+    ficam suspensas por um intervalo, em vez de cada sessão repetir a sua.
+    """
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._capacidade = {"leitura": COTA_LEITURAS_MINUTO, "escrita": COTA_ESCRITAS_MINUTO}
+        self._fichas = {tipo: float(capacidade) for tipo, capacidade in self._capacidade.items()}
+        self._uso = {tipo: deque() for tipo in self._capacidade}
+        self._reposto_em = time.monotonic()
+        self._bloqueado_ate = 0.0
+        self._descartadas = 0
+
+    def _repor(self, agora: float):
+        decorrido = agora - self._reposto_em
+        self._reposto_em = agora
+        for tipo, capacidade in self._capacidade.items():
+            self._fichas[tipo] = min(capacidade, self._fichas[tipo] + decorrido * capacidade / 60)
+            while self._uso[tipo] and agora - self._uso[tipo][0] > 60:
+                self._uso[tipo].popleft()
+
+    def adquirir(self, tipo: str = "leitura", prioridade: str = "normal", custo: int = 1,
+                 timeout: float = TEMPO_MAXIMO_ESPERA_COTA) -> bool:
+        """
+        Reserva fichas para uma chamada à API.
+        
+        Args:
+            tipo: "leitura" ou "escrita"
+            prioridade: "normal" aguarda na fila; "baixa" é descartada se a cota estiver baixa
+            custo: Quantidade de requisições que serão feitas
+            timeout: Tempo máximo de espera na fila, em segundos
             
-    return retry_with_backoff(_get_worksheet, max_retries=5, initial_delay=2)
+        Returns:
+            bool: True se a chamada pode ser feita
+        """
+        capacidade = self._capacidade[tipo]
+        custo = min(custo, capacidade)
+        reserva = capacidade * RESERVA_BAIXA_PRIORIDADE if prioridade == "baixa" else 0
+        prazo = time.monotonic() + timeout
+        
+        with self._condicao:
+            while True:
+                agora = time.monotonic()
+                self._repor(agora)
+                
+                if agora >= self._bloqueado_ate and self._fichas[tipo] >= custo + reserva:
+                    self._fichas[tipo] -= custo
+                    self._uso[tipo].extend([agora] * custo)
+                    return True
+                
+                if prioridade == "baixa":
+                    self._descartadas += 1
+                    return False
+                
+                espera = max(self._bloqueado_ate - agora, (custo - self._fichas[tipo]) * 60 / capacidade, 0.05)
+                if agora + espera > prazo:
+                    return False
+                self._condicao.wait(espera)
+
+    def registrar_cota_excedida(self, atraso: float):
+        """Suspende todas as chamadas por um intervalo após um erro de cota da API."""
+        with self._condicao:
+            self._bloqueado_ate = max(self._bloqueado_ate, time.monotonic() + atraso)
+            for tipo in self._fichas:
+                self._fichas[tipo] = 0.0
+
+    def uso(self) -> dict:
+        """Resumo do uso da cota no último minuto."""
+        with self._condicao:
+            agora = time.monotonic()
+            self._repor(agora)
+            return {
+                "leitura": (len(self._uso["leitura"]), self._capacidade["leitura"]),
+                "escrita": (len(self._uso["escrita"]), self._capacidade["escrita"]),
+                "bloqueado_por": max(0.0, self._bloqueado_ate - agora),
+                "descartadas": self._descartadas
+            }
 
-def retry_with_backoff(func, max_retries=5, initial_delay=1):
+@st.cache_resource
+def get_controlador_cota() -> ControladorCota:
+    return ControladorCota()
+
+def executar_com_cota(func, tipo="leitura", prioridade="normal", custo=1):
     """
-    Executa uma função com retry e exponential backoff
+    Executa uma chamada ao Google Sheets respeitando o controlador de cota.
+    
+    A chamada não é repetida dentro da sessão do usuário: se a cota estiver
+    esgotada ou a API recusar por cota, o controlador suspende as chamadas
+    de todas as sessões e a função retorna None imediatamente. Registros são
+    reenviados em segundo plano pelo outbox.
     
     Args:
         func: Função a ser executada
-        max_retries: Número máximo de tentativas
-        initial_delay: Delay inicial em segundos
+        tipo: "leitura" ou "escrita"
+        prioridade: "normal" ou "baixa" (descartada quando a cota está baixa)
+        custo: Quantidade de requisições feitas pela função
         
     Returns:
         Resultado da função ou None se falhar
     """
-    for attempt in range(max_retries):
+    controlador = get_controlador_cota()
+    if not controlador.adquirir(tipo, prioridade, custo):
+        if prioridade != "baixa":
+            st.warning("Limite de requisições ao Google Sheets atingido. Tente novamente em instantes.")
+        return None
+    
+    try:
+        return func()
+    except Exception as e:
+        if not _erro_de_cota(e):
+            st.error(f"Erro inesperado: {str(e)}")
+            return None
+        
+        # Backoff compartilhado com jitter, sem bloquear a sessão (a API não recusou
+        # as leituras de metadados descartadas pelo próprio controlador)
+        if not isinstance(e, CotaIndisponivel):
+            controlador.registrar_cota_excedida(TEMPO_BLOQUEIO_COTA + uniform(0, 5))
+        if prioridade != "baixa":
+            st.warning("Limite de requisições ao Google Sheets atingido. Tente novamente em instantes.")
+        return None
+
+# Diário local de registros pendentes de envio ao Google Sheets
+ARQUIVO_OUTBOX = "dados/outbox.db"
+INTERVALO_OUTBOX = 5  # segundos entre verificações do envio em segundo plano
+ATRASO_MAXIMO_OUTBOX = 300  # espera máxima entre tentativas após falhas
+
+class Outbox:
+    """
+    Diário local (SQLite) em que todos os registros são gravados antes do envio.
+    
+    Uma thread em segundo plano envia os registros pendentes em lotes (um
+    append_rows por aba) e os marca como enviados. Registros não enviados
+    sobrevivem a falhas de conexão, limites de cota e reinícios da aplicação.
+    Depois do envio, a mesma thread atribui uma vez por processo os IDs que
+    faltam nas linhas existentes (garantir_ids).
+    Não utiliza funções de interface do Streamlit.
+    """
+    def __init__(self, caminho: str):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._caminho = caminho
+        self._lock = threading.Lock()
+        self._evento = threading.Event()
+        self._atraso = INTERVALO_OUTBOX
+        # Abas ainda sem a verificação de IDs neste processo -> instante da próxima tentativa
+        self._ids_pendentes = {aba: 0.0 for aba in ABAS_COM_ID}
+        
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    aba TEXT NOT NULL,
+                    dados TEXT NOT NULL,
+                    criado_em TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pendente',
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    erro TEXT,
+                    enviado_em TEXT
+                )
+            """)
+            conexao.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status, id)")
+        
+        self._thread = threading.Thread(target=self._executar, name="outbox-sheets", daemon=True)
+        self._thread.start()
+
+    @contextmanager
+    def _conectar(self):
+        conexao = sqlite3.connect(self._caminho, timeout=30)
         try:
-            return func()
-        except Exception as e:
-            if "Quota exceeded" not in str(e):
-                st.error(f"Erro inesperado: {str(e)}")
-                return None
-                
-            if attempt == max_retries - 1:
-                st.error("Limite de tentativas excedido. Tente novamente mais tarde.")
-                return None
+            conexao.execute("PRAGMA journal_mode=WAL")
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def registrar(self, sheet_name: str, data_dict: dict) -> int:
+        """Grava um registro no diário e acorda o envio em segundo plano."""
+        dados = {chave: _valor_para_planilha(valor) for chave, valor in data_dict.items()}
+        with self._conectar() as conexao:
+            cursor = conexao.execute(
+                "INSERT INTO outbox (aba, dados, criado_em) VALUES (?, ?, ?)",
+                (sheet_name, json.dumps(dados, ensure_ascii=False, default=str), datetime.now().isoformat())
+            )
+        self._evento.set()
+        return cursor.lastrowid
+
+    def pendentes(self) -> int:
+        """Quantidade de registros ainda não enviados."""
+        with self._conectar() as conexao:
+            return conexao.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pendente'").fetchone()[0]
+
+    def enviar_pendentes(self, limite: int = 500) -> bool:
+        """
+        Envia os registros pendentes, agrupados por aba, em uma chamada append_rows por aba.
+        
+        Returns:
+            bool: True se não restaram falhas
+        """
+        with self._lock:
+            with self._conectar() as conexao:
+                linhas = conexao.execute(
+                    "SELECT id, aba, dados FROM outbox WHERE status = 'pendente' ORDER BY id LIMIT ?",
+                    (limite,)
+                ).fetchall()
+            
+            # Agrupar por aba mantendo a ordem de registro
+            por_aba = {}
+            for id_registro, aba, dados in linhas:
+                por_aba.setdefault(aba, []).append((id_registro, json.loads(dados)))
+            
+            sucesso = True
+            for aba, registros in por_aba.items():
+                ids = [id_registro for id_registro, _ in registros]
+                if not get_controlador_cota().adquirir("escrita", timeout=60):
+                    sucesso = False
+                    continue
                 
-            # Exponential backoff com jitter
-            delay = initial_delay * (2 ** attempt) + uniform(0, 1)
-            time.sleep(delay)
+                try:
+                    registry = get_worksheet_registry()
+                    headers = registry.headers(aba)
+                    # O ID é descartado em abas sem a coluna de ID, sem recarregar o cabeçalho
+                    if any(chave not in headers and chave != COLUNA_ID for _, dados in registros for chave in dados):
+                        headers = registry.headers(aba, refresh=True)
+                    
+                    rows = [[dados.get(header, "") for header in headers] for _, dados in registros]
+                    resposta = registry.worksheet(aba).append_rows(rows)
+                    
+                    with self._conectar() as conexao:
+                        conexao.executemany(
+                            "UPDATE outbox SET status = 'enviado', enviado_em = ?, erro = NULL WHERE id = ?",
+                            [(datetime.now().isoformat(), id_registro) for id_registro in ids]
+                        )
+                    
+                    # Acrescentar as linhas aos dados em cache (e aos agregados); se não for
+                    # possível, invalidar apenas os dados da aba alterada
+                    if not get_cache_dados().anexar_linhas(aba, headers, rows, _primeira_linha_anexada(resposta)):
+                        get_versoes_abas().incrementar(aba)
+                except Exception as e:
+                    sucesso = False
+                    if _erro_de_cota(e):
+                        if not isinstance(e, CotaIndisponivel):
+                            get_controlador_cota().registrar_cota_excedida(TEMPO_BLOQUEIO_COTA)
+                    else:
+                        # O cabeçalho pode ter mudado (colunas reordenadas ou excluídas):
+                        # relê-lo antes da próxima tentativa
+                        get_worksheet_registry().invalidate_headers(aba)
+                    with self._conectar() as conexao:
+                        conexao.executemany(
+                            "UPDATE outbox SET tentativas = tentativas + 1, erro = ? WHERE id = ?",
+                            [(str(e), id_registro) for id_registro in ids]
+                        )
+            return sucesso
+
+    def atribuir_ids(self):
+        """
+        Atribui os IDs que faltam nas abas ainda não verificadas neste processo.
+        Abas que não puderam ser concluídas (cota baixa, aba alterada durante a
+        verificação ou erro) são tentadas novamente após ATRASO_MAXIMO_OUTBOX.
+        """
+        for aba, proxima_tentativa in list(self._ids_pendentes.items()):
+            if time.monotonic() < proxima_tentativa:
+                continue
+            if garantir_ids(aba):
+                del self._ids_pendentes[aba]
+            else:
+                self._ids_pendentes[aba] = time.monotonic() + ATRASO_MAXIMO_OUTBOX
+
+    def _executar(self):
+        while True:
+            self._evento.wait(self._atraso)
+            self._evento.clear()
+            try:
+                sucesso = self.enviar_pendentes()
+            except Exception:
+                sucesso = False
             
-            # Informar usuário sobre retry
-            st.warning(f"Limite de requisições atingido. Tentando novamente em {delay:.1f} segundos...")
+            # IDs das linhas existentes, apenas com os registros pendentes já enviados
+            if sucesso and self._ids_pendentes:
+                try:
+                    self.atribuir_ids()
+                except Exception:
+                    pass  # Nova tentativa no próximo ciclo
             
-    return None
+            # Backoff exponencial fora da thread da interface
+            if sucesso:
+                self._atraso = INTERVALO_OUTBOX
+            else:
+                self._atraso = min(self._atraso * 2, ATRASO_MAXIMO_OUTBOX)
+
+@st.cache_resource
+def get_outbox() -> Outbox:
+    return Outbox(ARQUIVO_OUTBOX)
+
+def novo_id() -> str:
+    """Gera o identificador de uma nova linha (nunca interpretado como número pela planilha)."""
+    return f"ID-{uuid.uuid4().hex[:12].upper()}"
 
 def append_to_sheet(data_dict, sheet_name):
     """
-    Append new data to the Google Sheet with retry mechanism
+    Register new data in the local outbox to be appended to the Google Sheet
+    
+    The record is stored immediately in a local SQLite journal and sent in
+    batches by a background thread, so it is not lost if the quota is
+    exhausted or the connection fails.
     
     Args:
         data_dict: Dictionary with data to append
         sheet_name: Nome da aba da planilha
         
     Returns:
-        bool: True if success, False if error
+        bool: True if the record was stored, False if error
+    """
+    try:
+        get_outbox().registrar(sheet_name, {COLUNA_ID: novo_id(), **data_dict})
+        return True
+    except Exception as e:
+        st.error(f"Erro ao adicionar dados: {str(e)}")
+        return False
+
+def _primeira_linha_anexada(resposta) -> int:
+    """
+    Número da primeira linha gravada por um append_rows, obtido do intervalo
+    informado na resposta da API (ex.: "'Tarefas'!A120:E121" -> 120).
+    
+    Returns:
+        int: Número da linha, ou None se a resposta não informar o intervalo
+    """
+    try:
+        intervalo = resposta["updates"]["updatedRange"]
+        return a1_to_rowcol(intervalo.rsplit("!", 1)[-1].split(":")[0])[0]
+    except (KeyError, TypeError, IndexError, gspread.exceptions.IncorrectCellLabel):
+        return None
+
+def _values_to_dataframe(values: list) -> pd.DataFrame:
+    """
+    Converte os valores brutos de uma aba (primeira linha = cabeçalho) em DataFrame,
+    reproduzindo o comportamento de worksheet.get_all_records().
+    
+    Args:
+        values: Lista de linhas retornada pela API do Google Sheets
+        
+    Returns:
+        DataFrame com os dados da aba
+    """
+    if not values or len(values) < 2:
+        return pd.DataFrame()
+    
+    headers = values[0]
+    largura = len(headers)
+    
+    records = []
+    for row in values[1:]:
+        # A API omite células vazias no final da linha
+        row = list(row[:largura]) + [""] * (largura - len(row))
+        records.append(dict(zip(headers, numericise_all(row))))
+    
+    return pd.DataFrame(records)
+
+def fetch_snapshot(sheet_names: list) -> dict:
+    """
+    Lê várias abas da planilha em uma única requisição (values_batch_get).
+    Não trata erros nem utiliza a interface, podendo ser usada em segundo plano.
+    
+    Args:
+        sheet_names: Lista com os nomes das abas
+        
+    Returns:
+        dict: Nome da aba -> DataFrame com os dados
+    """
+    registry = get_worksheet_registry()
+    ranges = [f"'{nome}'" for nome in sheet_names]
+    response = registry.spreadsheet().values_batch_get(ranges)
+    
+    # A API devolve os intervalos na mesma ordem em que foram pedidos
+    value_ranges = response.get("valueRanges", [])
+    snapshot = {}
+    for nome, value_range in zip(sheet_names, value_ranges):
+        values = value_range.get("values", [])
+        if values:
+            # Aproveitar a leitura para atualizar o cabeçalho no registro
+            registry.set_headers(nome, values[0])
+        snapshot[nome] = _values_to_dataframe(values)
+    return snapshot
+
+def load_snapshot(sheet_names=None, prioridade="normal") -> dict:
     """
-    def _append():
+    Carrega várias abas da planilha em uma única requisição (values_batch_get).
+    
+    Args:
+        sheet_names: Lista com os nomes das abas ou None para todas as abas de SHEET_GIDS
+        prioridade: Prioridade da leitura no controlador de cota
+        
+    Returns:
+        dict: Nome da aba -> DataFrame com os dados ou None se ocorrer erro
+    """
+    if sheet_names is None:
+        sheet_names = list(SHEET_GIDS.keys())
+    
+    def _load_snapshot():
         try:
+            return fetch_snapshot(sheet_names)
+        except Exception as e:
+            if _erro_de_cota(e):
+                raise e  # Re-raise quota errors to the quota controller
+            st.error(f"Erro ao carregar planilhas: {str(e)}")
+            return None
+    
+    return executar_com_cota(_load_snapshot, "leitura", prioridade)
+
+def load_tabs(sheet_names: list, prioridade: str = "normal") -> dict:
+    """
+    Carrega os dados brutos de várias abas, sem cache (use get_data nas páginas).
+    
+    Com o espelho local ativo, as abas já sincronizadas são lidas da cópia local;
+    as demais são buscadas no Google Sheets em uma única requisição.
+    
+    Args:
+        sheet_names: Lista com os nomes das abas
+        prioridade: Prioridade da leitura no controlador de cota
+        
+    Returns:
+        dict: Nome da aba -> DataFrame, apenas para as abas carregadas com sucesso
+    """
+    resultado = {}
+    if ESPELHO_ATIVO:
+        espelho = get_espelho()
+        for nome in sheet_names:
+            if espelho.disponivel(nome):
+                resultado[nome] = espelho.ler(nome)
+    
+    restantes = [nome for nome in sheet_names if nome not in resultado]
+    if not restantes:
+        return resultado
+    
+    snapshot = load_snapshot(restantes, prioridade)
+    
+    if snapshot is None and len(restantes) == 1 and prioridade != "baixa":
+        # Fallback: carregar apenas a aba solicitada
+        sheet_name = restantes[0]
+        
+        def _load():
             worksheet = get_worksheet(sheet_name)
             if worksheet is None:
-                return False
+                return None
                 
-            # Converter objetos datetime para strings
-            for key in data_dict:
-                if isinstance(data_dict[key], (datetime, pd.Timestamp)):
-                    data_dict[key] = data_dict[key].strftime("%Y-%m-%d")
-                    
-            # Get headers from worksheet
-            headers = worksheet.row_values(1)
+            data = worksheet.get_all_records()
+            return pd.DataFrame(data)
+        
+        df = executar_com_cota(_load)
+        snapshot = {sheet_name: df} if df is not None else None
+    
+    resultado.update(snapshot or {})
+    return resultado
+
+def load_cauda(sheet_name: str, linhas: int, ultima_linha: list):
+    """
+    Lê apenas as linhas acrescentadas no fim de uma aba desde a última carga.
+    
+    A leitura começa na última linha já conhecida, que precisa estar inalterada;
+    caso contrário (linhas removidas, ordenadas ou editadas no fim da aba) a aba
+    deve ser recarregada por completo. O cabeçalho é lido na mesma requisição e
+    comparado com o registrado: colunas reordenadas, incluídas ou excluídas
+    também exigem a recarga (e atualizam o cabeçalho usado nas escritas).
+    
+    Args:
+        sheet_name: Nome da aba
+        linhas: Quantidade de linhas de dados já carregadas
+        ultima_linha: Valores da última linha carregada
+        
+    Returns:
+        DataFrame com as linhas novas (índice = posição na aba, 0 = linha 2),
+        vazio se não houver linhas novas, ou None se a aba precisar ser recarregada
+    """
+    if not linhas or ultima_linha is None:
+        return None
+    
+    def _load_cauda():
+        registry = get_worksheet_registry()
+        cabecalho = registry.headers(sheet_name)
+        coluna_final = rowcol_to_a1(1, len(cabecalho)).rstrip("0123456789")
+        # Cabeçalho atual e linhas a partir do último registro conhecido (linha 1 = cabeçalho)
+        resposta = registry.spreadsheet().values_batch_get([
+            f"'{sheet_name}'!1:1",
+            f"'{sheet_name}'!A{linhas + 1}:{coluna_final}"
+        ])
+        primeira, cauda = (intervalo.get("values", []) for intervalo in resposta.get("valueRanges", [{}, {}]))
+        if not primeira or primeira[0] != cabecalho:
+            registry.set_headers(sheet_name, primeira[0] if primeira else [])
+            return None
+        return _values_to_dataframe([cabecalho] + cauda)
+    
+    df = executar_com_cota(_load_cauda, "leitura", "baixa")
+    if df is None or df.empty or df.iloc[0].tolist() != ultima_linha:
+        return None
+    
+    novas = df.iloc[1:]
+    novas.index = range(linhas, linhas + len(novas))
+    return novas
+
+def update_worksheet(df_editado, worksheet_name):
+    """Função genérica para atualizar worksheet"""
+    try:
+        worksheet = get_worksheet(worksheet_name)
+        if worksheet is not None:
+            # Limpeza e reescrita consomem três requisições de escrita
+            if not get_controlador_cota().adquirir("escrita", custo=3):
+                st.warning("Limite de requisições ao Google Sheets atingido. Tente novamente em instantes.")
+                return
+            
+            df_alterado = df_editado.copy()
+            
+            # Remover colunas de controle antes de salvar
+            if 'DELETE' in df_alterado.columns:
+                df_alterado = df_alterado.drop(columns=['DELETE'])
             
-            # Create new row based on headers
-            row = [data_dict.get(header, "") for header in headers]
+            # Linhas incluídas no editor (sem ID) recebem um novo identificador
+            if worksheet_name in ABAS_COM_ID:
+                ids = df_alterado[COLUNA_ID] if COLUNA_ID in df_alterado.columns else [None] * len(df_alterado)
+                df_alterado[COLUNA_ID] = [
+                    valor if isinstance(valor, str) and valor.strip() else novo_id() for valor in ids
+                ]
             
-            # Append row to worksheet
-            worksheet.append_row(row)
+            # Limpar a planilha e reescrever os dados
+            worksheet.clear()
+            headers = df_alterado.columns.tolist()
+            worksheet.append_row(headers)
+            worksheet.append_rows(df_alterado.values.tolist())
+            get_worksheet_registry().set_headers(worksheet_name, headers)
             
-            # Clear cache to force data reload
-            st.cache_data.clear()
+            invalidar_cache_aba(worksheet_name)
+            st.success("Dados atualizados com sucesso!")
+            st.rerun()
+    except Exception as e:
+        st.error(f"Erro ao atualizar planilha: {str(e)}")
+
+def _valor_para_planilha(valor, coluna_data: bool = False):
+    """Converte um valor do DataFrame ou do editor para o formato gravado na planilha."""
+    if isinstance(valor, (list, dict)):
+        return str(valor)
+    if valor is None or pd.isna(valor):
+        return ""
+    if coluna_data or isinstance(valor, (datetime, date, pd.Timestamp)):
+        data_convertida = pd.to_datetime(valor, errors="coerce")
+        return data_convertida.strftime("%Y-%m-%d") if not pd.isna(data_convertida) else ""
+    if hasattr(valor, "item"):
+        # Tipos numpy não são serializáveis em JSON
+        return valor.item()
+    return valor
+
+def invalidar_cache_aba(sheet_name: str):
+    """
+    Descarta os dados em cache de uma aba após uma escrita, incrementando a sua
+    versão para todas as sessões. As demais abas continuam em cache.
+    
+    Args:
+        sheet_name: Nome da aba da planilha
+    """
+    get_versoes_abas().incrementar(sheet_name)
+    get_cache_dados().invalidar(sheet_name)
+    if ESPELHO_ATIVO:
+        get_espelho().marcar_desatualizada(sheet_name)
+
+def salvar_alteracoes_editor(editor_key: str, df_exibido: pd.DataFrame, sheet_name: str) -> bool:
+    """
+    Grava na planilha apenas as alterações feitas em um st.data_editor.
+    
+    Usa o estado do editor (linhas editadas, adicionadas e excluídas) para montar
+    um único batch_update com as células alteradas, um append_rows com as novas
+    linhas e uma única requisição de exclusão de linhas, sem limpar a planilha.
+    O índice de df_exibido deve ser o índice original dos dados carregados
+    (posição 0 corresponde à linha 2 da planilha).
+    
+    Args:
+        editor_key: Chave usada no st.data_editor
+        df_exibido: DataFrame passado ao editor
+        sheet_name: Nome da aba da planilha
+        
+    Returns:
+        bool: True se as alterações foram gravadas, False caso contrário
+    """
+    estado = st.session_state.get(editor_key, {})
+    edited_rows = estado.get("edited_rows", {})
+    added_rows = estado.get("added_rows", [])
+    deleted_rows = list(estado.get("deleted_rows", []))
+    
+    colunas_data = set(df_exibido.select_dtypes(include="datetime").columns)
+    
+    # Linhas marcadas na coluna de exclusão também são excluídas
+    for posicao, alteracoes in edited_rows.items():
+        if alteracoes.get("DELETE"):
+            deleted_rows.append(int(posicao))
+    
+    if not edited_rows and not added_rows and not deleted_rows:
+        st.info("Nenhuma alteração para salvar.")
+        return False
+    
+    def _salvar():
+        try:
+            registry = get_worksheet_registry()
+            worksheet = registry.worksheet(sheet_name)
+            headers = registry.headers(sheet_name)
+            
+            linhas_excluidas = sorted(
+                {int(df_exibido.index[int(posicao)]) + 2 for posicao in deleted_rows},
+                reverse=True
+            )
+            
+            # Células alteradas (também guardadas por linha para atualizar o cache)
+            atualizacoes = []
+            alteracoes_por_linha = {}
+            for posicao, alteracoes in edited_rows.items():
+                linha = int(df_exibido.index[int(posicao)]) + 2
+                if linha in linhas_excluidas:
+                    continue
+                for coluna, valor in alteracoes.items():
+                    if coluna not in headers:
+                        continue
+                    valor = _valor_para_planilha(valor, coluna in colunas_data)
+                    alteracoes_por_linha.setdefault(linha - 2, {})[coluna] = valor
+                    atualizacoes.append({
+                        "range": rowcol_to_a1(linha, headers.index(coluna) + 1),
+                        "values": [[valor]]
+                    })
+            if atualizacoes:
+                worksheet.batch_update(atualizacoes)
+            
+            # Novas linhas (inseridas no final, não alteram a numeração das demais)
+            novas_linhas = [
+                [
+                    novo_id() if header == COLUNA_ID else _valor_para_planilha(nova.get(header, ""), header in colunas_data)
+                    for header in headers
+                ]
+                for nova in added_rows
+                if not nova.get("DELETE")
+            ]
+            resposta = worksheet.append_rows(novas_linhas) if novas_linhas else None
+            
+            # Exclusões da última para a primeira linha para não deslocar os índices
+            if linhas_excluidas:
+                registry.spreadsheet().batch_update({
+                    "requests": [
+                        {
+                            "deleteDimension": {
+                                "range": {
+                                    "sheetId": worksheet.id,
+                                    "dimension": "ROWS",
+                                    "startIndex": linha - 1,
+                                    "endIndex": linha
+                                }
+                            }
+                        }
+                        for linha in linhas_excluidas
+                    ]
+                })
+            
+            # Sem exclusões a numeração das linhas não muda: as alterações são aplicadas
+            # aos dados em cache (e aos agregados) em vez de recarregar a aba
+            cache = get_cache_dados()
+            em_memoria = (
+                not linhas_excluidas
+                and cache.alterar_linhas(sheet_name, alteracoes_por_linha)
+                and (not novas_linhas
+                     or cache.anexar_linhas(sheet_name, headers, novas_linhas, _primeira_linha_anexada(resposta)))
+            )
+            if not em_memoria:
+                invalidar_cache_aba(sheet_name)
+            elif ESPELHO_ATIVO:
+                get_espelho().marcar_desatualizada(sheet_name)
             return True
             
         except Exception as e:
-            if "Quota exceeded" in str(e):
-                raise e  # Re-raise quota errors to trigger retry
-            st.error(f"Erro ao adicionar dados: {str(e)}")
+            if _erro_de_cota(e):
+                raise e  # Re-raise quota errors to the quota controller
+            get_worksheet_registry().invalidate_headers(sheet_name)
+            st.error(f"Erro ao atualizar planilha: {str(e)}")
             return False
-            
-    return retry_with_backoff(_append, initial_delay=2)
+    
+    custo = int(bool(edited_rows)) + int(bool(added_rows)) + int(bool(deleted_rows))
+    return executar_com_cota(_salvar, "escrita", custo=custo)
 
-def load_data(sheet_name: str) -> pd.DataFrame:
+def _letra_coluna(coluna: int) -> str:
+    """Letra da coluna na notação A1 (1 -> A)."""
+    return rowcol_to_a1(1, coluna).rstrip("0123456789")
+
+def garantir_ids(sheet_name: str) -> bool:
     """
-    Carrega dados de uma aba específica da planilha Google Sheets.
+    Cria a coluna de ID na aba (se necessário) e atribui um ID às linhas que não têm.
+    
+    Apenas as células de ID vazias são gravadas: IDs existentes nunca são
+    reescritos. A aba é lida novamente logo antes da gravação e, se mudou desde a
+    primeira leitura (linhas inseridas, excluídas ou editadas), nada é gravado e a
+    atribuição é tentada de novo mais tarde. Chamada em segundo plano pelo outbox,
+    com prioridade baixa no controlador de cota; não utiliza funções de interface
+    do Streamlit.
+    
+    Returns:
+        bool: True se a aba já tinha ou passou a ter IDs em todas as linhas
+    """
+    registry = get_worksheet_registry()
+    controlador = get_controlador_cota()
+    
+    def _ler():
+        if not controlador.adquirir("leitura", "baixa"):
+            return None
+        return registry.spreadsheet().values_get(f"'{sheet_name}'").get("values", [])
+    
+    try:
+        valores = _ler()
+        if valores is None:
+            return False
+        if len(valores) < 2:
+            return True
+        
+        cabecalho = valores[0]
+        coluna_nova = COLUNA_ID not in cabecalho
+        coluna = len(cabecalho) + 1 if coluna_nova else cabecalho.index(COLUNA_ID) + 1
+        vazias = [
+            numero
+            for numero, linha in enumerate(valores[1:], start=2)
+            if len(linha) < coluna or str(linha[coluna - 1]).strip() == ""
+        ]
+        if not coluna_nova and not vazias:
+            return True
+        
+        # Sequências de linhas vazias consecutivas são gravadas como um único intervalo
+        letra = _letra_coluna(coluna)
+        intervalos = []
+        for numero in vazias:
+            if intervalos and intervalos[-1][1] == numero - 1:
+                intervalos[-1][1] = numero
+            else:
+                intervalos.append([numero, numero])
+        dados = [
+            {"range": f"'{sheet_name}'!{letra}{inicio}:{letra}{fim}", "values": [[novo_id()] for _ in range(inicio, fim + 1)]}
+            for inicio, fim in intervalos
+        ]
+        if coluna_nova:
+            dados.insert(0, {"range": f"'{sheet_name}'!{letra}1", "values": [[COLUNA_ID]]})
+        
+        # Conferir que a aba não mudou desde a leitura, para não gravar IDs em linhas deslocadas
+        if _ler() != valores or not controlador.adquirir("escrita", "baixa", custo=2):
+            return False
+        
+        worksheet = registry.worksheet(sheet_name)
+        if worksheet.col_count < coluna:
+            worksheet.add_cols(coluna - worksheet.col_count)
+        registry.spreadsheet().values_batch_update({"valueInputOption": "RAW", "data": dados})
+        
+        registry.headers(sheet_name, refresh=True)
+        invalidar_cache_aba(sheet_name)
+        return True
+    
+    except Exception as e:
+        if _erro_de_cota(e) and not isinstance(e, CotaIndisponivel):
+            controlador.registrar_cota_excedida(TEMPO_BLOQUEIO_COTA)
+        return False
+
+def _localizar_linha_id(sheet_name: str, id_registro: str) -> tuple:
+    """
+    Localiza na planilha a linha com o ID (chamada dentro de executar_com_cota).
+    
+    A posição indicada pelo índice do cache é conferida lendo apenas a célula de ID
+    daquela linha; se a aba mudou desde a carga, o ID é procurado na coluna.
+    
+    Returns:
+        tuple: (número da linha ou None, True se a posição do cache foi confirmada)
+    """
+    registry = get_worksheet_registry()
+    headers = registry.headers(sheet_name)
+    if COLUNA_ID not in headers:
+        return None, False
+    letra = _letra_coluna(headers.index(COLUNA_ID) + 1)
+    
+    indice = get_cache_dados().indice_id(sheet_name, id_registro)
+    if indice is not None:
+        linha = indice + 2
+        celula = registry.spreadsheet().values_get(f"'{sheet_name}'!{letra}{linha}").get("values", [])
+        if celula and celula[0] and str(celula[0][0]) == id_registro:
+            return linha, True
+    
+    coluna = registry.spreadsheet().values_get(f"'{sheet_name}'!{letra}2:{letra}").get("values", [])
+    for posicao, valor in enumerate(coluna):
+        if valor and str(valor[0]) == id_registro:
+            return posicao + 2, False
+    return None, False
+
+def atualizar_linha(sheet_name: str, id_registro: str, valores: dict) -> bool:
+    """
+    Grava apenas as células informadas da linha com o ID, em um único batch_update.
     
     Args:
         sheet_name: Nome da aba da planilha
+        id_registro: Valor da coluna de ID da linha
+        valores: Coluna -> novo valor
         
     Returns:
-        DataFrame com os dados carregados
+        bool: True se a linha foi encontrada e atualizada
     """
-    # Verificar se os dados já estão em cache na sessão
-    cache_key = f"raw_data_{sheet_name}"
+    def _atualizar():
+        try:
+            linha, posicao_confirmada = _localizar_linha_id(sheet_name, id_registro)
+            if linha is None:
+                st.error("Não foi possível encontrar o registro na planilha (ele pode ter sido excluído).")
+                return False
+            
+            headers = get_worksheet_registry().headers(sheet_name)
+            gravados = {
+                coluna: _valor_para_planilha(valor, coluna == "Data")
+                for coluna, valor in valores.items()
+                if coluna in headers
+            }
+            if gravados:
+                get_worksheet_registry().worksheet(sheet_name).batch_update([
+                    {"range": rowcol_to_a1(linha, headers.index(coluna) + 1), "values": [[valor]]}
+                    for coluna, valor in gravados.items()
+                ])
+            
+            # A linha está na posição do cache: aplicar a alteração em memória
+            if not (posicao_confirmada and get_cache_dados().alterar_linhas(sheet_name, {linha - 2: gravados})):
+                invalidar_cache_aba(sheet_name)
+            elif ESPELHO_ATIVO:
+                get_espelho().marcar_desatualizada(sheet_name)
+            return True
+        
+        except Exception as e:
+            if _erro_de_cota(e):
+                raise e  # Re-raise quota errors to the quota controller
+            get_worksheet_registry().invalidate_headers(sheet_name)
+            st.error(f"Erro ao atualizar planilha: {str(e)}")
+            return False
     
-    # Tentar recuperar do cache da sessão primeiro
-    if cache_key in st.session_state and "last_updated" in st.session_state:
-        # Verificar se o cache ainda é válido (menos de 1 hora)
-        time_diff = datetime.now() - st.session_state["last_updated"].get(sheet_name, datetime.min)
-        if time_diff.total_seconds() < 3600:  # 1 hora em segundos
-            return st.session_state[cache_key]
+    return bool(executar_com_cota(_atualizar, "escrita", custo=2))
+
+def excluir_linha(sheet_name: str, id_registro: str) -> bool:
+    """
+    Exclui da planilha apenas a linha com o ID.
     
-    # Se não estiver em cache ou o cache estiver expirado, carregar do Google Sheets
-    def _load():
-        worksheet = get_worksheet(sheet_name)
-        if worksheet is None:
-            return pd.DataFrame()
+    Returns:
+        bool: True se a linha foi encontrada e excluída
+    """
+    def _excluir():
+        try:
+            linha, _ = _localizar_linha_id(sheet_name, id_registro)
+            if linha is None:
+                st.error("Não foi possível encontrar o registro na planilha (ele pode ter sido excluído).")
+                return False
             
-        data = worksheet.get_all_records()
-        return pd.DataFrame(data)
+            registry = get_worksheet_registry()
+            registry.spreadsheet().batch_update({
+                "requests": [{
+                    "deleteDimension": {
+                        "range": {
+                            "sheetId": registry.worksheet(sheet_name).id,
+                            "dimension": "ROWS",
+                            "startIndex": linha - 1,
+                            "endIndex": linha
+                        }
+                    }
+                }]
+            })
+            
+            # A exclusão desloca as linhas seguintes: recarregar a aba
+            invalidar_cache_aba(sheet_name)
+            return True
+        
+        except Exception as e:
+            if _erro_de_cota(e):
+                raise e  # Re-raise quota errors to the quota controller
+            st.error(f"Erro ao excluir: {str(e)}")
+            return False
+    
+    return bool(executar_com_cota(_excluir, "escrita", custo=2))
+
+########################################## ESPELHO LOCAL ##########################################
+
+# Espelho local opcional da planilha (ative com a variável de ambiente ESPELHO_LOCAL=1)
+ESPELHO_ATIVO = os.environ.get("ESPELHO_LOCAL", "").lower() in ("1", "true", "sim")
+ARQUIVO_ESPELHO = "dados/espelho.db"
+INTERVALO_ESPELHO = 60  # segundos entre sincronizações
+INTERVALO_VERIFICACAO_ESPELHO = 900  # segundos entre leituras completas das abas lidas pela cauda
+
+# Colunas indexadas em cada aba do espelho (consultadas pelos filtros das páginas)
+ESPELHO_INDICES = {
+    "Tarefas": ["Data", "Setor"],
+    "Pós": ["DATA", "SETOR"],
+    "Auditoria": ["Data"]
+}
+
+class EspelhoLocal:
+    """
+    Cópia local (SQLite) das abas da planilha, sincronizada em segundo plano.
     
-    result = retry_with_backoff(_load)
+    Cada aba é uma tabela com as colunas de ESPELHO_INDICES indexadas; as datas
+    do esquema são gravadas como AAAA-MM-DD para que os filtros por período das
+    páginas consultem o índice (consultar). A coluna _linha guarda o número da
+    linha na planilha.
     
-    # Se carregou com sucesso, atualizar o cache
-    if result is not None and not result.empty:
-        st.session_state[cache_key] = result
+    A sincronização só lê a planilha quando a data de modificação mudou (ou há
+    escritas pendentes) e usa uma única requisição: as abas com leitura da
+    cauda (CLASSES_ATUALIZACAO) trazem apenas o cabeçalho e as linhas a partir
+    da última já espelhada, e as demais são lidas por inteiro. Uma cauda que não
+    confere (cabeçalho ou última linha diferentes) faz a aba ser relida por
+    inteiro; alterações no meio dessas abas são vistas na verificação completa
+    periódica. Apenas as linhas cujo conteúdo mudou (hash por linha) são gravadas.
+    Não utiliza funções de interface do Streamlit.
+    """
+    def __init__(self, caminho: str):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._caminho = caminho
+        self._lock = threading.Lock()
+        self._evento = threading.Event()
+        self._desatualizadas = set()
+        self._modificado_em = None  # Data de modificação da planilha na última sincronização completa
+        self._verificado_em = None  # Instante da última leitura completa de todas as abas
         
-        # Inicializar ou atualizar o dicionário de timestamps
-        if "last_updated" not in st.session_state:
-            st.session_state["last_updated"] = {}
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS espelho_abas (
+                    aba TEXT PRIMARY KEY,
+                    colunas TEXT NOT NULL,
+                    linhas INTEGER NOT NULL,
+                    sincronizado_em TEXT NOT NULL
+                )
+            """)
         
-        # Atualizar o timestamp para esta planilha
-        st.session_state["last_updated"][sheet_name] = datetime.now()
-    
-    return result if result is not None else pd.DataFrame()
+        self._thread = threading.Thread(target=self._executar, name="espelho-sheets", daemon=True)
+        self._thread.start()
 
-def update_sheet(df: pd.DataFrame, sheet_name: str) -> bool:
-    def _update():
+    @contextmanager
+    def _conectar(self):
+        conexao = sqlite3.connect(self._caminho, timeout=30)
         try:
-            # Criar uma cópia do DataFrame para não modificar o original
-            df_copy = df.copy()
-            df_copy['Data'] = pd.to_datetime(df_copy['Data'], errors='coerce', format="%Y-%m-%d")
-            df_copy = df_copy.dropna(subset=["Data"])
+            conexao.execute("PRAGMA journal_mode=WAL")
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    @staticmethod
+    def _tabela(sheet_name: str) -> str:
+        return f"aba_{SHEET_GIDS[sheet_name]}"
+
+    @staticmethod
+    def _coluna(nome: str) -> str:
+        return '"' + str(nome).replace('"', '""') + '"'
+
+    @staticmethod
+    def _hash(valores) -> str:
+        valores = [_valor_para_planilha(valor) for valor in valores]
+        return hashlib.sha1(json.dumps(valores, default=str).encode("utf-8")).hexdigest()
+
+    def _colunas(self, conexao, sheet_name: str):
+        linha = conexao.execute("SELECT colunas FROM espelho_abas WHERE aba = ?", (sheet_name,)).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def _estado(self, conexao, sheet_name: str):
+        """Colunas e quantidade de linhas espelhadas da aba, ou None se ainda não sincronizada."""
+        linha = conexao.execute(
+            "SELECT colunas, linhas FROM espelho_abas WHERE aba = ?", (sheet_name,)
+        ).fetchone()
+        return (json.loads(linha[0]), linha[1]) if linha else None
+
+    def disponivel(self, sheet_name: str) -> bool:
+        """Indica se a aba já foi sincronizada e não tem escritas pendentes de sincronização."""
+        if sheet_name not in SHEET_GIDS or sheet_name in self._desatualizadas:
+            return False
+        with self._conectar() as conexao:
+            return self._colunas(conexao, sheet_name) is not None
+
+    def marcar_desatualizada(self, sheet_name: str):
+        """Desvia as leituras da aba para o Google Sheets até a próxima sincronização."""
+        self._desatualizadas.add(sheet_name)
+        self._evento.set()
+
+    def ler(self, sheet_name: str) -> pd.DataFrame:
+        """Lê uma aba inteira do espelho (ver consultar)."""
+        return self.consultar(sheet_name)
+
+    def consultar(self, sheet_name: str, intervalos: dict = None, valores: dict = None) -> pd.DataFrame:
+        """
+        Lê as linhas da aba que atendem aos filtros, usando os índices do espelho.
+        O índice do DataFrame corresponde à posição da linha nos dados da
+        planilha (0 = linha 2), como no carregamento direto.
+        
+        Args:
+            intervalos: Coluna -> (início, fim), inclusive; datas são comparadas como AAAA-MM-DD
+            valores: Coluna -> valores aceitos (None para não filtrar a coluna)
+        """
+        with self._conectar() as conexao:
+            colunas = self._colunas(conexao, sheet_name)
+            if not colunas:
+                return pd.DataFrame()
             
-            # Converter todas as colunas de data para string no formato YYYY-MM-DD
-            date_columns = df_copy.select_dtypes(include=['datetime64[ns]']).columns
-            for col in date_columns:
-                df_copy[col] = df_copy[col].dt.strftime("%Y-%m-%d")
+            condicoes, parametros = [], []
+            for coluna, (inicio, fim) in (intervalos or {}).items():
+                if coluna in colunas:
+                    condicoes.append(f"{self._coluna(coluna)} BETWEEN ? AND ?")
+                    parametros += [_valor_para_planilha(inicio), _valor_para_planilha(fim)]
+            for coluna, aceitos in (valores or {}).items():
+                if coluna in colunas and aceitos is not None:
+                    aceitos = [_valor_para_planilha(valor) for valor in aceitos]
+                    condicoes.append(f"{self._coluna(coluna)} IN ({', '.join('?' * len(aceitos))})" if aceitos else "0")
+                    parametros += aceitos
+            filtro = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
             
-            # Converter todos os valores NaN/None para string vazia
-            df_copy = df_copy.fillna("")
+            df = pd.read_sql_query(
+                f"SELECT _linha, {', '.join(self._coluna(c) for c in colunas)} FROM {self._tabela(sheet_name)}"
+                f"{filtro} ORDER BY _linha",
+                conexao,
+                params=parametros
+            )
+        df.index = df.pop("_linha") - 2
+        df.index.name = None
+        return df
+
+    def _ler_planilha(self, completas: list, caudas: dict) -> dict:
+        """
+        Lê em uma única requisição as abas completas e, das abas em caudas, o
+        cabeçalho e as linhas a partir da última já espelhada.
+        
+        Args:
+            completas: Abas lidas por inteiro
+            caudas: Aba -> (colunas, linhas) espelhadas
             
-            worksheet = get_worksheet(sheet_name)
-            if worksheet is None:
-                return False
-                
-            # Limpar a planilha
-            worksheet.clear()
+        Returns:
+            dict: Aba -> (DataFrame ou None se o cabeçalho mudou, posição da primeira linha lida; 0 = linha 2)
+        """
+        registry = get_worksheet_registry()
+        ranges = [f"'{nome}'" for nome in completas]
+        for nome, (colunas, linhas) in caudas.items():
+            ranges += [f"'{nome}'!1:1", f"'{nome}'!A{linhas + 1}:{_letra_coluna(len(colunas))}"]
+        
+        # A API devolve os intervalos na mesma ordem em que foram pedidos
+        value_ranges = iter(registry.spreadsheet().values_batch_get(ranges).get("valueRanges", []))
+        lidas = {}
+        for nome in completas:
+            values = next(value_ranges, {}).get("values", [])
+            if values:
+                registry.set_headers(nome, values[0])
+            lidas[nome] = (_values_to_dataframe(values), 0)
+        for nome, (colunas, linhas) in caudas.items():
+            cabecalho = (next(value_ranges, {}).get("values") or [[]])[0]
+            cauda = next(value_ranges, {}).get("values", [])
+            df = _values_to_dataframe([cabecalho] + cauda) if cabecalho == colunas else None
+            lidas[nome] = (df, linhas - 1)
+        return lidas
+
+    def _cauda_confere(self, conexao, sheet_name: str, df: pd.DataFrame, inicio: int) -> bool:
+        """Indica se a primeira linha da cauda lida é a última linha já espelhada, sem alterações."""
+        if df is None or df.empty:
+            return False
+        linha = conexao.execute(
+            f"SELECT _hash FROM {self._tabela(sheet_name)} WHERE _linha = ?", (inicio + 2,)
+        ).fetchone()
+        return linha is not None and linha[0] == self._hash(df.iloc[0].tolist())
+
+    def sincronizar(self, sheet_names=None):
+        """Sincroniza as abas informadas (ou todas) com uma única leitura da planilha."""
+        todas = sheet_names is None
+        if todas:
+            sheet_names = list(SHEET_GIDS.keys())
+        
+        # Planilha sem modificações desde a última sincronização completa: nada a ler
+        modificado_em, _ = get_sonda_modificacao().atual()
+        if (modificado_em is not None
+                and modificado_em == self._modificado_em
+                and not self._desatualizadas & set(sheet_names)):
+            return
+        
+        # A sincronização é adiada quando a cota está baixa
+        if not get_controlador_cota().adquirir("leitura", "baixa"):
+            return
+        
+        with self._lock:
+            # Abas marcadas antes da leitura estarão atualizadas após a sincronização
+            pendentes = self._desatualizadas & set(sheet_names)
             
-            # Obter os dados do DataFrame como lista
-            data = [df_copy.columns.tolist()] + df_copy.values.tolist()
+            # Abas com leitura da cauda, fora da verificação completa periódica
+            completa = (self._verificado_em is None
+                        or time.monotonic() - self._verificado_em >= INTERVALO_VERIFICACAO_ESPELHO)
+            caudas = {}
+            if not completa:
+                with self._conectar() as conexao:
+                    for nome in sheet_names:
+                        classe = CLASSES_ATUALIZACAO[CLASSE_ABAS.get(nome, "padrao")]
+                        estado = self._estado(conexao, nome)
+                        if nome not in pendentes and classe["cauda"] is not None and estado and estado[1] > 0:
+                            caudas[nome] = estado
             
-            # Atualizar a planilha
-            worksheet.update(data)
+            try:
+                lidas = self._ler_planilha([nome for nome in sheet_names if nome not in caudas], caudas)
+                
+                # Caudas que não conferem: reler as abas por inteiro, se a cota permitir
+                with self._conectar() as conexao:
+                    recarregar = [
+                        nome for nome, (df, inicio) in lidas.items()
+                        if nome in caudas and not self._cauda_confere(conexao, nome, df, inicio)
+                    ]
+                for nome in recarregar:
+                    del lidas[nome]
+                if recarregar and get_controlador_cota().adquirir("leitura", "baixa"):
+                    lidas.update(self._ler_planilha(recarregar, {}))
+            except Exception as e:
+                if _erro_de_cota(e) and not isinstance(e, CotaIndisponivel):
+                    get_controlador_cota().registrar_cota_excedida(TEMPO_BLOQUEIO_COTA)
+                raise
             
-            # Limpar cache para forçar recarregamento dos dados
-            st.cache_data.clear()
-            return True
+            with self._conectar() as conexao:
+                alteradas = [
+                    sheet_name for sheet_name, (df, inicio) in lidas.items()
+                    if self._sincronizar_aba(conexao, sheet_name, df, inicio)
+                ]
             
-        except Exception as e:
-            st.error(f"Erro ao atualizar planilha: {str(e)}")
+            self._desatualizadas -= pendentes & set(lidas)
+            if todas and set(lidas) == set(sheet_names):
+                self._modificado_em = modificado_em
+                if completa:
+                    self._verificado_em = time.monotonic()
+            
+            # Abas alteradas fora da aplicação passam a ser lidas novamente
+            for sheet_name in alteradas:
+                get_versoes_abas().incrementar(sheet_name)
+
+    @staticmethod
+    def _normalizar_datas(sheet_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Datas do esquema gravadas como AAAA-MM-DD (valores não reconhecidos ficam como estão)."""
+        esquema = ESQUEMAS.get(sheet_name, {})
+        normalizado = df.copy()
+        for coluna, formato in esquema.get("datas", {}).items():
+            if coluna in df.columns:
+                datas = _converter_datas(df[coluna], formato, coluna in esquema.get("datas_inferidas", []))
+                normalizado[coluna] = datas.dt.strftime("%Y-%m-%d").astype(object).where(datas.notna(), df[coluna])
+        return normalizado
+
+    def _sincronizar_aba(self, conexao, sheet_name: str, df: pd.DataFrame, inicio: int = 0) -> bool:
+        """
+        Grava as linhas alteradas de uma aba e indica se houve alguma mudança.
+        
+        Args:
+            df: Linhas lidas da planilha
+            inicio: Posição da primeira linha lida (0 = linha 2); as anteriores são mantidas
+        """
+        tabela = self._tabela(sheet_name)
+        colunas = [str(c) for c in df.columns]
+        total = inicio + len(df)
+        linhas_anteriores = conexao.execute(
+            "SELECT linhas FROM espelho_abas WHERE aba = ?", (sheet_name,)
+        ).fetchone()
+        estrutura_alterada = self._colunas(conexao, sheet_name) != colunas
+        
+        # Estrutura da aba mudou: recriar a tabela
+        if estrutura_alterada:
+            conexao.execute(f"DROP TABLE IF EXISTS {tabela}")
+            definicao = ", ".join(self._coluna(c) for c in colunas)
+            conexao.execute(
+                f"CREATE TABLE {tabela} (_linha INTEGER PRIMARY KEY, _hash TEXT NOT NULL{', ' + definicao if definicao else ''})"
+            )
+        for coluna in ESPELHO_INDICES.get(sheet_name, []):
+            if coluna in colunas:
+                conexao.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{tabela}_{colunas.index(coluna)} ON {tabela} ({self._coluna(coluna)})"
+                )
+        
+        # Comparar o hash de cada linha (valores como lidos) e gravar apenas as alteradas
+        hashes_atuais = dict(conexao.execute(
+            f"SELECT _linha, _hash FROM {tabela} WHERE _linha >= ?", (inicio + 2,)
+        ).fetchall())
+        gravados = self._normalizar_datas(sheet_name, df)
+        alteradas = []
+        for posicao, (valores, valores_gravados) in enumerate(
+                zip(df.itertuples(index=False, name=None), gravados.itertuples(index=False, name=None)), start=inicio):
+            linha = posicao + 2
+            hash_linha = self._hash(valores)
+            if hashes_atuais.get(linha) != hash_linha:
+                alteradas.append([linha, hash_linha] + [_valor_para_planilha(valor) for valor in valores_gravados])
+        
+        if alteradas:
+            marcadores = ", ".join(["?"] * (len(colunas) + 2))
+            conexao.executemany(f"INSERT OR REPLACE INTO {tabela} VALUES ({marcadores})", alteradas)
+        conexao.execute(f"DELETE FROM {tabela} WHERE _linha > ?", (total + 1,))
+        
+        conexao.execute(
+            "INSERT OR REPLACE INTO espelho_abas (aba, colunas, linhas, sincronizado_em) VALUES (?, ?, ?, ?)",
+            (sheet_name, json.dumps(colunas, ensure_ascii=False), total, datetime.now().isoformat())
+        )
+        
+        return (
+            estrutura_alterada
+            or bool(alteradas)
+            or linhas_anteriores is None
+            or linhas_anteriores[0] != total
+        )
+
+    def _executar(self):
+        while True:
+            try:
+                self.sincronizar()
+            except Exception:
+                pass  # Nova tentativa na próxima sincronização
+            self._evento.wait(INTERVALO_ESPELHO)
+            self._evento.clear()
+
+@st.cache_resource
+def get_espelho() -> EspelhoLocal:
+    return EspelhoLocal(ARQUIVO_ESPELHO)
+
+def consultar_espelho(sheet_name: str, intervalos: dict = None, valores: dict = None):
+    """
+    Linhas formatadas da aba dentro dos filtros, consultadas pelos índices do espelho local.
+    
+    Returns:
+        DataFrame, ou None se o espelho não estiver ativo ou a aba não estiver
+        sincronizada (nesse caso a página filtra os dados em cache)
+    """
+    if not ESPELHO_ATIVO or not get_espelho().disponivel(sheet_name):
+        return None
+    return preparar_aba(sheet_name, get_espelho().consultar(sheet_name, intervalos, valores))
+
+def filtrar_linhas(sheet_name: str, df: pd.DataFrame, intervalos: dict = None, valores: dict = None) -> pd.DataFrame:
+    """
+    Linhas da aba dentro dos filtros: pelos índices do espelho local, se ativo,
+    ou selecionadas nos dados em cache (df).
+    
+    Args:
+        intervalos: Coluna -> (início, fim), inclusive
+        valores: Coluna -> valores aceitos (None para não filtrar a coluna)
+    """
+    linhas = consultar_espelho(sheet_name, intervalos, valores)
+    if linhas is not None:
+        return linhas
+    
+    selecao = pd.Series(True, index=df.index)
+    for coluna, (inicio, fim) in (intervalos or {}).items():
+        selecao &= (df[coluna] >= inicio) & (df[coluna] <= fim)
+    for coluna, aceitos in (valores or {}).items():
+        if aceitos is not None:
+            selecao &= df[coluna].isin(aceitos)
+    return df[selecao]
+
+########################################## DADOS ##########################################
+
+# Configuração do Google Sheets
+SHEET_ID = "1EsJTZYTGJHpiRNg3U-GiqYDojjEGH7OAeKJRPzZuTIs"
+SHEET_GIDS = {
+    "Tarefas": "0",
+    "AtividadesExtras": "1017708666",
+    "Auditoria": "543590152",
+    "Base": "503847224",
+    "Reforma": "1252125692",
+    "Expansão": "2099988266",
+    "Pós": "1874058370"
+}
+
+# Correspondência entre os tipos de dados usados em get_data e as abas da planilha
+ABAS_POR_TIPO = {
+    "tarefas": "Tarefas",
+    "extras": "AtividadesExtras",
+    "auditoria": "Auditoria",
+    "reforma": "Reforma",
+    "expansao": "Expansão",
+    "base": "Base",
+    "pos": "Pós"
+}
+
+# Constantes para diretórios e arquivos
+PASTA_POS = "dados/pos-aplicacao"
+ARQUIVO_POS_CSV = "dados/pos_aplicacao.csv"
+
+# Envio em lotes da Pós-Aplicação (o tamanho do lote se ajusta à latência observada)
+LOTE_POS_INICIAL = 200
+LOTE_POS_MINIMO = 50
+LOTE_POS_MAXIMO = 2000
+LATENCIA_ALVO_LOTE = 3.0  # segundos por requisição append_rows
+
+# Classes de atualização dos dados em cache:
+# - ttl: idade máxima (segundos) dos dados antes de uma recarga completa da aba
+# - cauda: intervalo (segundos) para buscar apenas as linhas acrescentadas no fim da aba
+#   (None = sem leitura parcial)
+CLASSES_ATUALIZACAO = {
+    "referencia": {"ttl": 86400, "cauda": None},  # Dados praticamente estáticos
+    "incremental": {"ttl": 3600, "cauda": 120},   # Registros quase sempre acrescentados no fim
+    "quente": {"ttl": 300, "cauda": None},        # Dados editados com frequência
+    "padrao": {"ttl": 1800, "cauda": None}
+}
+
+# Classe de atualização de cada aba
+CLASSE_ABAS = {
+    "Tarefas": "quente",
+    "AtividadesExtras": "incremental",
+    "Auditoria": "padrao",
+    "Base": "referencia",
+    "Reforma": "padrao",
+    "Expansão": "padrao",
+    "Pós": "incremental"
+}
+
+# Coluna com o identificador estável de cada linha. Novos registros sempre recebem um
+# ID; as abas abaixo também têm os IDs atribuídos às linhas existentes (garantir_ids)
+COLUNA_ID = "ID"
+ABAS_COM_ID = list(SHEET_GIDS)
+
+# Enumerações dos campos preenchidos por seleção nos formulários
+COLABORADORES = ["Ana", "Camila", "Gustavo", "Maico", "Márcio", "Pedro", "Talita", "Washington", "Willian", "Iago"]
+TIPOS_TAREFA = [
+    "Projeto de Sistematização", "Mapa de Sistematização", "LOC", "Projeto de Transbordo",
+    "Projeto de Colheita", "Projeto de Sulcação", "Projeto de Fertirrigação", "Mapa de Pré-Plantio",
+    "Mapa de Pós-Plantio", "Mapa de Pós-Aplicação", "Mapa de Cadastro", "Mapa de Expansão", "Auditoria", "Outro"
+]
+STATUS_TAREFA = ["A fazer", "Em andamento", "A validar", "Concluído"]
+UNIDADES = ["Paraguaçu", "Narandiba", "Desconhecida"]  # "Desconhecida": setores sem cadastro na Base
+
+# Esquema de cada aba, aplicado uma única vez quando a aba é carregada (preparar_aba):
+# - datas: coluna -> formato gravado pelo app (valores fora do formato ficam sem data)
+# - datas_inferidas: colunas de datas em que os valores fora do formato são inferidos
+#   (dia primeiro), para dados importados de outras fontes
+# - datas_obrigatorias: linhas sem data válida nestas colunas são descartadas
+# - inteiros / numeros: colunas numéricas (valores inválidos viram 0)
+# - textos: colunas convertidas para texto sem espaços nas extremidades
+# - categorias: coluna -> enumeração conhecida (valores adicionais da planilha são mantidos)
+# - normalizar_colunas: remover espaços extras dos nomes das colunas
+ESQUEMAS = {
+    "Tarefas": {
+        "datas": {"Data": "%Y-%m-%d"},
+        "datas_obrigatorias": ["Data"],
+        "inteiros": ["Setor"],
+        "categorias": {"Colaborador": COLABORADORES, "Tipo": TIPOS_TAREFA, "Status": STATUS_TAREFA}
+    },
+    "AtividadesExtras": {
+        "datas": {"Data": "%Y-%m-%d"},
+        "datas_obrigatorias": ["Data"],
+        "categorias": {"Colaborador": COLABORADORES}
+    },
+    "Auditoria": {
+        "datas": {"Data": "%Y-%m-%d"},
+        "datas_obrigatorias": ["Data"]
+    },
+    "Base": {
+        "inteiros": ["Setor"],
+        "categorias": {"Unidade": UNIDADES}
+    },
+    "Reforma": {
+        "normalizar_colunas": True,
+        "textos": ["Unidade"],
+        "numeros": ["Area"]
+    },
+    "Expansão": {
+        "normalizar_colunas": True,
+        "textos": ["Unidade"],
+        "numeros": ["Area"]
+    },
+    "Pós": {
+        "datas": {"DATA": "%Y-%m-%d"},
+        "datas_inferidas": ["DATA"],
+        "inteiros": ["SETOR"],
+        "categorias": {"DESC_OPERAÇÃO": []}
+    }
+}
+
+# Intervalo (segundos) em que uma consulta à data de modificação da planilha é reaproveitada
+INTERVALO_SONDA_MODIFICACAO = 30
+
+class SondaModificacao:
+    """
+    Consulta barata da data de modificação da planilha (modifiedTime no Drive).
+    
+    Usada antes de recarregar uma aba com TTL expirado: se a planilha não foi
+    modificada desde a carga, os dados em cache continuam válidos. A consulta
+    usa a API do Drive, sem consumir a cota de leitura do Sheets, e o
+    resultado é compartilhado por todas as sessões por alguns segundos.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._valor = None
+        self._consultado_em = 0.0
+
+    def atual(self):
+        """
+        Retorna o modifiedTime da planilha (ou None se não for possível
+        consultar) e o instante da consulta que o obteve.
+        """
+        with self._lock:
+            if time.monotonic() - self._consultado_em >= INTERVALO_SONDA_MODIFICACAO:
+                try:
+                    self._valor = get_worksheet_registry().spreadsheet().get_lastUpdateTime()
+                except Exception:
+                    self._valor = None
+                self._consultado_em = time.monotonic()
+            return self._valor, self._consultado_em
+
+@st.cache_resource
+def get_sonda_modificacao() -> SondaModificacao:
+    return SondaModificacao()
+
+class CacheDados:
+    """
+    Cache único dos dados das abas, compartilhado por todas as sessões.
+    
+    Cada entrada guarda o DataFrame já formatado, a versão da aba em que foi
+    carregado, os instantes da carga e da última verificação e a data de
+    modificação da planilha naquele momento. A entrada é usada enquanto a versão
+    for a atual e os prazos da classe da aba (CLASSE_ABAS) não tiverem expirado;
+    as páginas podem pedir um prazo menor (tolerância). Expirado o prazo:
+    - se a planilha não mudou (data de modificação), os prazos são renovados;
+    - em abas com leitura da cauda, apenas as linhas novas são buscadas;
+    - caso contrário, a aba é recarregada.
+    Atualizações por prazo têm baixa prioridade: se o controlador de cota as
+    adiar, os dados anteriores continuam sendo servidos.
+    
+    Escritas feitas pelo próprio app (linhas acrescentadas e células editadas)
+    são aplicadas diretamente na entrada, sem recarregar a aba; os observadores
+    registrados recebem as linhas removidas e acrescentadas em cada alteração.
+    """
+    def __init__(self):
+        self._locks_abas = {nome: threading.Lock() for nome in SHEET_GIDS}
+        self._entradas = {}
+        self._cargas = count(1)
+        self._observadores = []
+        self._visoes = {}
+
+    def _valida(self, sheet_name: str, tolerancia: float = None) -> bool:
+        entrada = self._entradas.get(sheet_name)
+        if entrada is None or entrada["versao"] != versao_aba(sheet_name):
             return False
+        
+        classe = CLASSES_ATUALIZACAO[CLASSE_ABAS.get(sheet_name, "padrao")]
+        limite = classe["cauda"] or classe["ttl"]
+        if tolerancia is not None:
+            limite = min(limite, tolerancia)
+        
+        agora = time.monotonic()
+        return agora - entrada["carregado_em"] < classe["ttl"] and agora - entrada["verificado_em"] < limite
+
+    def _atualizar_cauda(self, sheet_name: str) -> bool:
+        """
+        Acrescenta à entrada da aba as linhas novas do fim da planilha.
+        
+        Returns:
+            bool: False se a cauda não pôde ser lida ou se a aba mudou de outra forma
+                  (nesses casos a aba deve ser recarregada)
+        """
+        entrada = self._entradas[sheet_name]
+        novas = load_cauda(sheet_name, entrada["linhas"], entrada["ultima_linha"])
+        if novas is None:
+            return False
+        
+        if not novas.empty:
+            ultima_linha = novas.iloc[-1].tolist()
+            linhas = entrada["linhas"] + len(novas)
+            novas = preparar_aba(sheet_name, novas)
+            self._substituir_entrada(
+                sheet_name,
+                pd.concat([entrada["df"], novas]),
+                removidas=novas.iloc[0:0],
+                adicionadas=novas,
+                linhas=linhas,
+                ultima_linha=ultima_linha
+            )
+        self._entradas[sheet_name]["verificado_em"] = time.monotonic()
+        return True
+
+    def _entrada(self, sheet_name: str):
+        """Retorna a entrada da aba, carregando-a se necessário (None se não houver dados)."""
+        if not self._valida(sheet_name):
+            self.atualizar([sheet_name])
+        return self._entradas.get(sheet_name)
+
+    def ler(self, sheet_name: str) -> pd.DataFrame:
+        """Retorna os dados formatados da aba, carregando-os se necessário."""
+        entrada = self._entrada(sheet_name)
+        return entrada["df"] if entrada else pd.DataFrame()
+
+    def derivar_com_chave(self, nome: str, sheet_names: list, calcular) -> tuple:
+        """
+        Retorna uma visão derivada de uma ou mais abas.
+        
+        A visão é calculada uma vez por combinação de cargas das abas (versão e
+        número da carga) e compartilhada por todas as sessões; o DataFrame
+        retornado não deve ser alterado. Alterações em memória de uma aba mudam
+        o número da carga, e a visão é recalculada na próxima consulta.
+        
+        Args:
+            nome: Identificador da visão
+            sheet_names: Abas usadas no cálculo
+            calcular: Função que recebe os DataFrames das abas e retorna a visão
+            
+        Returns:
+            tuple: (visão; chaves (versão, carga) das abas de origem; DataFrames das abas)
+        """
+        entradas = [self._entrada(nome_aba) for nome_aba in sheet_names]
+        chaves = tuple((e["versao"], e["carga"]) if e else None for e in entradas)
+        dados = [e["df"] if e else pd.DataFrame() for e in entradas]
+        
+        visao = self._visoes.get(nome)
+        if visao is None or visao["chaves"] != chaves:
+            visao = {"chaves": chaves, "df": calcular(*dados)}
+            self._visoes[nome] = visao
+        return visao["df"], chaves, dados
+
+    def derivar(self, nome: str, sheet_names: list, calcular) -> pd.DataFrame:
+        """Retorna apenas o DataFrame de uma visão derivada (ver derivar_com_chave)."""
+        return self.derivar_com_chave(nome, sheet_names, calcular)[0]
+
+    def valida(self, sheet_name: str) -> bool:
+        """Indica se a aba tem dados em cache na versão atual e dentro dos prazos da sua classe."""
+        return self._valida(sheet_name)
+
+    def garantir(self, sheet_names: list, prioridade: str = None, tolerancia: float = None):
+        """
+        Carrega em uma única requisição as abas ausentes ou expiradas.
+        
+        Args:
+            tolerancia: Idade máxima (segundos) aceita para os dados, se menor que a da classe da aba
+        """
+        pendentes = [nome for nome in sheet_names if not self._valida(nome, tolerancia)]
+        if pendentes:
+            self.atualizar(pendentes, prioridade=prioridade, tolerancia=tolerancia)
+
+    def atualizar(self, sheet_names: list, forcar: bool = False, prioridade: str = None,
+                  tolerancia: float = None):
+        """
+        Recarrega as abas informadas.
+        
+        Uma aba sendo carregada por outra sessão (ou pelo pré-carregamento) não
+        é buscada de novo: a trava da aba faz a chamada aguardar essa carga.
+        
+        Args:
+            sheet_names: Lista com os nomes das abas
+            forcar: Recarregar mesmo que os dados em cache ainda sejam válidos
+            prioridade: Prioridade da leitura; por padrão "baixa" apenas para abas expiradas
+            tolerancia: Idade máxima (segundos) aceita para os dados, se menor que a da classe da aba
+        """
+        # Travas adquiridas sempre na mesma ordem para evitar impasses
+        travas = [self._locks_abas[nome] for nome in SHEET_GIDS if nome in sheet_names]
+        for trava in travas:
+            trava.acquire()
+        try:
+            # Outra sessão pode ter carregado as abas enquanto esta aguardava
+            pendentes = [nome for nome in sheet_names if forcar or not self._valida(nome, tolerancia)]
+            if not pendentes:
+                return
+            
+            versoes = {nome: versao_aba(nome) for nome in pendentes}
+            
+            # Sonda de modificação: abas expiradas sem alterações na planilha só renovam o TTL
+            # (com o espelho local a leitura já é local e a sonda é dispensada)
+            modificado_em, consultado_em = (None, 0.0) if ESPELHO_ATIVO else get_sonda_modificacao().atual()
+            if modificado_em is not None and not forcar:
+                for nome in list(pendentes):
+                    entrada = self._entradas.get(nome)
+                    if (entrada is not None
+                            and entrada["versao"] == versoes[nome]
+                            and entrada.get("modificado_em") == modificado_em):
+                        # Renova a partir da consulta: mudanças posteriores a ela são vistas na próxima expiração
+                        entrada["carregado_em"] = entrada["verificado_em"] = consultado_em
+                        pendentes.remove(nome)
+                if not pendentes:
+                    return
+            
+            # Abas com leitura da cauda ainda dentro do TTL: buscar apenas as linhas novas
+            if not forcar and not ESPELHO_ATIVO:
+                for nome in list(pendentes):
+                    entrada = self._entradas.get(nome)
+                    classe = CLASSES_ATUALIZACAO[CLASSE_ABAS.get(nome, "padrao")]
+                    if (entrada is not None
+                            and classe["cauda"] is not None
+                            and entrada["versao"] == versoes[nome]
+                            and time.monotonic() - entrada["carregado_em"] < classe["ttl"]
+                            and self._atualizar_cauda(nome)):
+                        pendentes.remove(nome)
+                if not pendentes:
+                    return
             
-    return retry_with_backoff(_update, initial_delay=2)
+            # Se todas as abas têm dados na versão atual (apenas expirados), a leitura pode ser adiada
+            apenas_expiradas = all(
+                self._entradas.get(nome, {}).get("versao") == versoes[nome] for nome in pendentes
+            )
+            if prioridade is None:
+                prioridade = "baixa" if apenas_expiradas and not forcar else "normal"
+            brutos = load_tabs(pendentes, prioridade)
+            
+            for nome, df in brutos.items():
+                agora = time.monotonic()
+                self._entradas[nome] = {
+                    # Cabeçalho e linhas brutas carregadas, usados na leitura da cauda e nas
+                    # escritas aplicadas em memória (antes da formatação)
+                    "colunas": list(df.columns),
+                    "linhas": len(df),
+                    "ultima_linha": df.iloc[-1].tolist() if not df.empty else None,
+                    "df": preparar_aba(nome, df),
+                    "versao": versoes[nome],
+                    "carregado_em": agora,
+                    "verificado_em": agora,
+                    "modificado_em": modificado_em,
+                    "carga": next(self._cargas)
+                }
+        finally:
+            for trava in travas:
+                trava.release()
+
+    def observar(self, funcao):
+        """
+        Registra uma função chamada a cada alteração em memória de uma aba, com os
+        argumentos (aba, chave anterior, chave nova, linhas removidas, linhas
+        acrescentadas). A chave de uma entrada é o par (versão, carga).
+        """
+        self._observadores.append(funcao)
+
+    def ler_com_chave(self, sheet_name: str) -> tuple:
+        """
+        Retorna os dados formatados da aba e a chave (versão, carga) da entrada de onde
+        vieram (None se a aba não tiver dados), carregando-os se necessário.
+        """
+        entrada = self._entrada(sheet_name)
+        if entrada is None:
+            return pd.DataFrame(), None
+        return entrada["df"], (entrada["versao"], entrada["carga"])
+
+    def indice_id(self, sheet_name: str, id_registro: str):
+        """
+        Índice da linha com o ID nos dados em cache (0 = linha 2 da planilha), ou None.
+        
+        O índice ID -> linha é montado uma vez por carga da aba, na primeira consulta.
+        """
+        entrada = self._entradas.get(sheet_name)
+        if entrada is None or COLUNA_ID not in entrada["df"].columns:
+            return None
+        if "indice_ids" not in entrada:
+            ids = entrada["df"][COLUNA_ID].astype(str)
+            entrada["indice_ids"] = dict(zip(ids[ids != ""], ids.index[ids != ""]))
+        return entrada["indice_ids"].get(id_registro)
+
+    def _substituir_entrada(self, sheet_name: str, df: pd.DataFrame, removidas: pd.DataFrame,
+                            adicionadas: pd.DataFrame, **campos):
+        """Grava a entrada alterada com um novo número de carga e avisa os observadores."""
+        entrada = self._entradas[sheet_name]
+        anterior = (entrada["versao"], entrada["carga"])
+        self._entradas[sheet_name] = {
+            **{chave: valor for chave, valor in entrada.items() if chave != "indice_ids"},
+            **campos,
+            "df": restaurar_categorias(sheet_name, df),
+            "carga": next(self._cargas)
+        }
+        atual = (entrada["versao"], self._entradas[sheet_name]["carga"])
+        for funcao in self._observadores:
+            funcao(sheet_name, anterior, atual, removidas, adicionadas)
 
-def update_worksheet(df_editado, worksheet_name):
-    """Função genérica para atualizar worksheet"""
-    try:
-        worksheet = get_worksheet(worksheet_name)
-        if worksheet is not None:
-            # Identificar as linhas alteradas
-            df_original = pd.DataFrame(worksheet.get_all_records())
-            df_alterado = df_editado.copy()
+    def anexar_linhas(self, sheet_name: str, headers: list, rows: list, primeira_linha: int) -> bool:
+        """
+        Acrescenta à entrada da aba as linhas gravadas por um append_rows.
+        
+        Args:
+            headers: Cabeçalho usado para montar as linhas
+            rows: Valores gravados na planilha
+            primeira_linha: Número da linha da planilha em que a primeira linha foi gravada
             
-            # Remover colunas de controle antes de salvar
-            if 'DELETE' in df_alterado.columns:
-                df_alterado = df_alterado.drop(columns=['DELETE'])
+        Returns:
+            bool: False se a entrada não pôde ser atualizada (aba fora do cache, em outra
+                  versão, com cabeçalho diferente ou com linhas gravadas por terceiros
+                  desde a carga); nesses casos a aba deve ser invalidada
+        """
+        with self._locks_abas[sheet_name]:
+            entrada = self._entradas.get(sheet_name)
+            if (entrada is None
+                    or entrada["versao"] != versao_aba(sheet_name)
+                    or entrada.get("colunas") != list(headers)
+                    or primeira_linha != entrada["linhas"] + 2):
+                return False
             
-            # Limpar a planilha e reescrever os dados
-            worksheet.clear()
-            headers = df_alterado.columns.tolist()
-            worksheet.append_row(headers)
-            worksheet.append_rows(df_alterado.values.tolist())
+            brutas = _values_to_dataframe([list(headers)] + [list(row) for row in rows])
+            brutas.index = range(entrada["linhas"], entrada["linhas"] + len(brutas))
+            # Valores como gravados pelo app; se a planilha os formatar de outra maneira,
+            # a próxima leitura da cauda recarrega a aba
+            ultima_linha = brutas.iloc[-1].tolist()
+            novas = preparar_aba(sheet_name, brutas)
             
-            st.cache_data.clear()
-            st.success("Dados atualizados com sucesso!")
-            st.rerun()
-    except Exception as e:
-        st.error(f"Erro ao atualizar planilha: {str(e)}")
+            self._substituir_entrada(
+                sheet_name,
+                pd.concat([entrada["df"], novas]),
+                removidas=novas.iloc[0:0],
+                adicionadas=novas,
+                linhas=entrada["linhas"] + len(rows),
+                ultima_linha=ultima_linha
+            )
+            return True
+
+    def alterar_linhas(self, sheet_name: str, alteracoes: dict) -> bool:
+        """
+        Aplica à entrada da aba as células gravadas por um batch_update.
+        
+        Args:
+            alteracoes: Índice da linha nos dados (0 = linha 2 da planilha) -> {coluna: valor gravado}
+            
+        Returns:
+            bool: False se a entrada não pôde ser atualizada (aba fora do cache, em outra
+                  versão, ou linhas que a formatação descartaria); nesses casos a aba
+                  deve ser invalidada
+        """
+        if not alteracoes:
+            return True
+        
+        with self._locks_abas[sheet_name]:
+            entrada = self._entradas.get(sheet_name)
+            if entrada is None or entrada["versao"] != versao_aba(sheet_name):
+                return False
+            
+            df = entrada["df"]
+            rotulos = list(alteracoes)
+            if not pd.Index(rotulos).isin(df.index).all():
+                return False  # Linha descartada na carga (sem data válida)
+            
+            anteriores = df.loc[rotulos]
+            linhas = anteriores.astype(object)
+            for rotulo, valores in alteracoes.items():
+                for coluna, valor in valores.items():
+                    if coluna in linhas.columns:
+                        linhas.at[rotulo, coluna] = valor
+            novas = preparar_aba(sheet_name, linhas)
+            if len(novas) != len(rotulos):
+                return False
+            
+            campos = {}
+            if max(rotulos) >= entrada["linhas"] - 1:
+                # A última linha bruta mudou: a próxima leitura da cauda recarrega a aba
+                campos["ultima_linha"] = None
+            
+            self._substituir_entrada(
+                sheet_name,
+                pd.concat([df.drop(index=rotulos), novas]).sort_index(),
+                removidas=anteriores,
+                adicionadas=novas,
+                **campos
+            )
+            return True
 
-########################################## DADOS ##########################################
+    def invalidar(self, sheet_name: str = None):
+        """Descarta os dados de uma aba (ou de todas) do cache."""
+        if sheet_name:
+            self._entradas.pop(sheet_name, None)
+        else:
+            self._entradas.clear()
 
-# Configuração do Google Sheets
-SHEET_ID = "1EsJTZYTGJHpiRNg3U-GiqYDojjEGH7OAeKJRPzZuTIs"
-SHEET_GIDS = {
-    "Tarefas": "0",
-    "AtividadesExtras": "1017708666",
-    "Auditoria": "543590152",
-    "Base": "503847224",
-    "Reforma": "1252125692",
-    "Expansão": "2099988266",
-    "Pós": "1874058370"
-}
+@st.cache_resource
+def get_cache_dados() -> CacheDados:
+    return CacheDados()
 
-# Constantes para diretórios e arquivos
-PASTA_POS = "dados/pos-aplicacao"
-ARQUIVO_POS_CSV = "dados/pos_aplicacao.csv"
+class PreCarregamento:
+    """
+    Pré-carregamento das abas no início da sessão, em segundo plano.
+    
+    As abas ausentes ou expiradas são buscadas juntas, em uma única leitura
+    em lote com prioridade baixa no controlador de cota (é descartada quando a
+    cota está baixa). As páginas continuam lendo pelo cache de dados: uma aba
+    em carregamento faz a página aguardar essa leitura, e uma aba que o
+    pré-carregamento não conseguiu obter é carregada pela própria página.
+    """
+    def __init__(self, cache: CacheDados):
+        self._cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pre-carregamento")
+        self._lock = threading.Lock()
+        self._em_andamento = set()
+
+    def agendar(self, sheet_names: list):
+        """Agenda o carregamento das abas ausentes ou expiradas que ainda não estão em andamento."""
+        with self._lock:
+            pendentes = [
+                nome for nome in sheet_names
+                if nome not in self._em_andamento and not self._cache.valida(nome)
+            ]
+            if not pendentes:
+                return
+            self._em_andamento.update(pendentes)
+            self._executor.submit(self._carregar, pendentes)
+
+    def _carregar(self, sheet_names: list):
+        try:
+            self._cache.garantir(sheet_names, prioridade="baixa")
+        except Exception:
+            pass  # A página carrega a aba quando precisar dela
+        finally:
+            with self._lock:
+                self._em_andamento.difference_update(sheet_names)
+
+@st.cache_resource
+def get_pre_carregamento() -> PreCarregamento:
+    return PreCarregamento(get_cache_dados())
 
-# Função para carregar dados sob demanda usando o sistema de sessão do Streamlit
 def get_data(data_type):
     """
-    Carrega dados sob demanda e armazena na sessão para evitar recarregamentos desnecessários.
+    Retorna os dados de um tipo a partir do cache único de dados.
     
     Args:
         data_type: Tipo de dados a serem carregados (tarefas, extras, auditoria, etc.)
     
     Returns:
-        DataFrame com os dados solicitados
+        DataFrame com os dados solicitados (cópia, que pode ser alterada pela página)
     """
-    # Criar chave para a sessão
-    session_key = f"data_{data_type}"
-    
-    # Verificar se os dados já estão na sessão
-    if session_key not in st.session_state:
-        # Carregar dados conforme o tipo solicitado
-        if data_type == "tarefas":
-            st.session_state[session_key] = carregar_tarefas()
-        elif data_type == "extras":
-            st.session_state[session_key] = carregar_atividades_extras()
-        elif data_type == "auditoria":
-            st.session_state[session_key] = carregar_auditoria()
-        elif data_type == "reforma":
-            st.session_state[session_key] = carregar_reforma()
-        elif data_type == "expansao":
-            st.session_state[session_key] = carregar_expansao()
-        elif data_type == "base":
-            st.session_state[session_key] = carregar_dados_base()
-        elif data_type == "pos":
-            st.session_state[session_key] = carregar_dados_pos()
-    
-    return st.session_state[session_key]
-
-# Função para limpar o cache de dados quando necessário
-def clear_data_cache(data_type=None):
-    """
-    Limpa o cache de dados para forçar o recarregamento.
+    return get_cache_dados().ler(ABAS_POR_TIPO[data_type]).copy()
+
+def _converter_datas(serie: pd.Series, formato: str, inferir: bool = False) -> pd.Series:
+    """
+    Converte uma coluna de datas usando o formato declarado no esquema.
     
-    Args:
-        data_type: Tipo específico de dados para limpar ou None para limpar todos
+    Com inferir=True, os valores que não seguem o formato passam pela inferência
+    (mais lenta, dia primeiro); caso contrário ficam sem data.
     """
-    if data_type:
-        session_key = f"data_{data_type}"
-        if session_key in st.session_state:
-            del st.session_state[session_key]
-    else:
-        # Limpar todos os caches de dados
-        keys_to_delete = [k for k in st.session_state.keys() if k.startswith("data_")]
-        for key in keys_to_delete:
-            del st.session_state[key]
+    datas = pd.to_datetime(serie, errors="coerce", format=formato)
+    if not inferir:
+        return datas
+    falhas = datas.isna() & serie.notna() & (serie.astype(str).str.strip() != "")
+    if falhas.any():
+        datas[falhas] = pd.to_datetime(serie[falhas], errors="coerce", dayfirst=True)
+    return datas
+
+def _converter_categoria(serie: pd.Series, enumeracao: list) -> pd.Series:
+    """
+    Converte uma coluna de texto em categórica.
+    
+    As categorias são a enumeração declarada seguida dos demais valores
+    encontrados na planilha, para que nenhum valor existente seja perdido.
+    """
+    textos = serie.astype(str).where(serie.notna())
+    extras = sorted(set(textos.dropna().unique()) - set(enumeracao))
+    return pd.Series(
+        pd.Categorical(textos, categories=list(enumeracao) + extras),
+        index=serie.index,
+        name=serie.name
+    )
 
-@st.cache_data(ttl=3600)  # Aumentado para 1 hora
-def carregar_tarefas():
-    """Carrega e formata os dados de tarefas."""
-    df = load_data("Tarefas")
-    if not df.empty:
-        if "Data" in df.columns:
-            df["Data"] = pd.to_datetime(df["Data"], errors='coerce', format="%Y-%m-%d")
-            df = df.dropna(subset=["Data"])
-        if "Setor" in df.columns:
-            df["Setor"] = pd.to_numeric(df["Setor"], errors='coerce').fillna(0).astype(int)
+def preparar_aba(sheet_name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica o esquema da aba (ESQUEMAS) aos dados brutos carregados.
+    
+    Chamada uma única vez por carga pelo cache de dados; as páginas recebem as
+    colunas já convertidas e não precisam repetir as conversões.
+    """
+    esquema = ESQUEMAS.get(sheet_name, {})
+    if df.empty:
+        return df
+    
+    if esquema.get("normalizar_colunas"):
+        # Remover espaços extras dos nomes das colunas
+        df.columns = [str(col).strip() for col in df.columns]
+    
+    for coluna, formato in esquema.get("datas", {}).items():
+        if coluna in df.columns:
+            df[coluna] = _converter_datas(df[coluna], formato, coluna in esquema.get("datas_inferidas", []))
+    
+    for coluna in esquema.get("inteiros", []):
+        if coluna in df.columns:
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').fillna(0).astype(int)
+    
+    for coluna in esquema.get("numeros", []):
+        if coluna in df.columns:
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').fillna(0)
+    
+    for coluna in esquema.get("textos", []):
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype(str).str.strip()
+    
+    for coluna, enumeracao in esquema.get("categorias", {}).items():
+        if coluna in df.columns:
+            df[coluna] = _converter_categoria(df[coluna], enumeracao)
+    
+    # Linhas sem data válida são descartadas
+    obrigatorias = [col for col in esquema.get("datas_obrigatorias", []) if col in df.columns]
+    if obrigatorias:
+        df = df.dropna(subset=obrigatorias)
+    
     return df
 
-@st.cache_data(ttl=3600)  # Aumentado para 1 hora
-def carregar_atividades_extras():
-    """Carrega os dados de atividades extras."""
-    df = load_data("AtividadesExtras")
-    if not df.empty and "Data" in df.columns:
-        df["Data"] = pd.to_datetime(df["Data"], errors='coerce', format="%Y-%m-%d")
-        df = df.dropna(subset=["Data"])
+def restaurar_categorias(sheet_name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reaplica as colunas categóricas do esquema após concatenar dados da aba
+    (a concatenação de categóricas com categorias diferentes resulta em texto).
+    """
+    for coluna, enumeracao in ESQUEMAS.get(sheet_name, {}).get("categorias", {}).items():
+        if coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = _converter_categoria(df[coluna], enumeracao)
     return df
 
-@st.cache_data(ttl=3600)  # Aumentado para 1 hora
-def carregar_auditoria():
-    """Carrega os dados de auditoria."""
-    df = load_data("Auditoria")
-    if not df.empty and "Data" in df.columns:
-        df["Data"] = pd.to_datetime(df["Data"], errors='coerce', format="%Y-%m-%d")
-        df = df.dropna(subset=["Data"])
+def enriquecer_tarefas(df_tarefas: pd.DataFrame, df_base: pd.DataFrame) -> pd.DataFrame:
+    """
+    Acrescenta às tarefas os dados do setor cadastrados na Base ('Area', 'Unidade').
+    
+    As colunas são obtidas por consulta ao índice de Setor da Base, preservando o
+    índice das tarefas (usado para localizar as linhas na planilha).
+    """
+    if df_tarefas.empty:
+        return df_tarefas
+    
+    df = df_tarefas.copy()
+    if not df_base.empty and "Setor" in df_base.columns:
+        # Um registro por setor, indexado pelo número do setor (o ID da Base não substitui o da tarefa)
+        base_por_setor = df_base.drop_duplicates(subset="Setor").set_index("Setor").drop(columns=[COLUNA_ID], errors="ignore")
+        for coluna in base_por_setor.columns:
+            df[coluna] = df["Setor"].map(base_por_setor[coluna])
+    
+    # Tratar valores nulos (setores sem cadastro na Base)
+    df['Area'] = df['Area'].fillna(0) if 'Area' in df.columns else 0
+    if 'Unidade' in df.columns:
+        df['Unidade'] = df['Unidade'].fillna('Desconhecida')
+    else:
+        df['Unidade'] = 'Desconhecida'
     return df
 
-@st.cache_data(ttl=3600)  # Aumentado para 1 hora
-def carregar_dados_base():
-    """Carrega e formata os dados base."""
-    df = load_data("Base")
-    if not df.empty and "Setor" in df.columns:
-        df["Setor"] = pd.to_numeric(df["Setor"], errors='coerce').fillna(0).astype(int)
-    return df
+def get_tarefas_enriquecidas() -> pd.DataFrame:
+    """
+    Tarefas com os dados da Base, calculadas uma vez por carga de Tarefas e Base.
+    
+    Returns:
+        DataFrame compartilhado (somente leitura)
+    """
+    return get_cache_dados().derivar("tarefas_enriquecidas", ["Tarefas", "Base"], enriquecer_tarefas)
+
+def adicionar_mes_pos(df_pos: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta aos registros da Pós-Aplicação a coluna 'MES' (primeiro dia do mês da DATA)."""
+    if df_pos.empty or "DATA" not in df_pos.columns:
+        return df_pos
+    return df_pos.assign(MES=df_pos["DATA"].dt.to_period("M").dt.to_timestamp())
+
+# Agregados mantidos em memória para as páginas:
+# - abas: aba principal (cujas linhas são contadas) seguida das abas auxiliares
+# - preparar: função que recebe as linhas da aba principal e os dados das auxiliares
+# - visao: visão derivada do cache (CacheDados.derivar) com as linhas já preparadas
+# - dimensoes: colunas que identificam cada célula do agregado
+# - datas: dimensões convertidas para data ao montar o agregado
+# - soma: coluna somada em cada célula (além da contagem de linhas)
+AGREGADOS = {
+    "tarefas": {
+        "abas": ["Tarefas", "Base"],
+        "preparar": enriquecer_tarefas,
+        "visao": "tarefas_enriquecidas",
+        "dimensoes": ["Data", "Colaborador", "Tipo", "Status", "Unidade"],
+        "datas": ["Data"],
+        "soma": "Area"
+    },
+    "extras": {
+        "abas": ["AtividadesExtras"],
+        "preparar": None,
+        "visao": None,
+        "dimensoes": ["Data", "Colaborador", "SetorSolicitante"],
+        "datas": ["Data"],
+        "soma": None
+    },
+    # Setores distintos por mês/operação são contados sobre as células do agregado
+    "pos": {
+        "abas": ["Pós"],
+        "preparar": adicionar_mes_pos,
+        "visao": "pos_por_mes",
+        "dimensoes": ["MES", "SETOR", "DESC_OPERAÇÃO", "TALHÃO"],
+        "datas": ["MES"],
+        "soma": "AREA"
+    }
+}
 
-@st.cache_data(ttl=3600)  # Aumentado para 1 hora
-def carregar_reforma() -> pd.DataFrame:
-    """Carrega os dados de reforma."""
-    df = load_data("Reforma")
+class AgregadosIncrementais:
+    """
+    Contagens por combinação de dimensões (AGREGADOS), compartilhadas por todas as sessões.
     
-    # Verificar e normalizar nomes de colunas
-    if not df.empty:
-        # Normalizar os nomes das colunas (remover espaços extras e converter para string)
-        df.columns = [col.strip() for col in df.columns]
+    Cada agregado é calculado uma vez por carga das suas abas. As linhas
+    acrescentadas ou editadas pelo próprio app chegam pelo cache de dados
+    (CacheDados.observar) e são aplicadas como +1/-1 nas células afetadas, sem
+    percorrer a aba novamente. As páginas filtram e agrupam o agregado, que tem
+    no máximo uma linha por combinação de dimensões.
+    """
+    def __init__(self, cache: CacheDados):
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._agregados = {}
+        cache.observar(self._aplicar_alteracao)
+
+    @staticmethod
+    def _acumular(definicao: dict, celulas: dict, linhas: pd.DataFrame, sinal: int):
+        """Soma (sinal=1) ou subtrai (sinal=-1) as linhas nas células do agregado."""
+        if linhas.empty:
+            return
         
-        # Converter a coluna Unidade para string
-        if "Unidade" in df.columns:
-            df["Unidade"] = df["Unidade"].astype(str).str.strip()
+        dimensoes = definicao["dimensoes"]
+        soma = definicao["soma"]
+        valores = pd.DataFrame(
+            {coluna: linhas[coluna].astype(object) if coluna in linhas.columns else None for coluna in dimensoes},
+            index=linhas.index
+        )
+        valores["_soma"] = pd.to_numeric(linhas[soma], errors="coerce").fillna(0) if soma in linhas.columns else 0
+        grupos = valores.groupby(dimensoes, dropna=False)["_soma"].agg(["size", "sum"])
+        ausentes = grupos.index.to_frame(index=False).isna().any(axis=1).to_numpy()
         
-        # Garantir que a coluna Area seja numérica
-        if "Area" in df.columns:
-            df["Area"] = pd.to_numeric(df["Area"], errors='coerce').fillna(0)
-    
-    return df
+        for chave, ausente, quantidade, total in zip(
+                grupos.index.to_list(), ausentes, grupos["size"].to_list(), grupos["sum"].to_list()):
+            if ausente:
+                # Valores ausentes viram None para que a chave possa ser encontrada novamente
+                chave = tuple(None if pd.isna(valor) else valor for valor in chave)
+            celula = celulas.setdefault(chave, [0, 0.0])
+            celula[0] += sinal * quantidade
+            celula[1] += sinal * total
+            if celula[0] <= 0:
+                del celulas[chave]
+
+    def _aplicar_alteracao(self, sheet_name, anterior, atual, removidas, adicionadas):
+        with self._lock:
+            for nome, definicao in AGREGADOS.items():
+                agregado = self._agregados.get(nome)
+                if agregado is None or definicao["abas"][0] != sheet_name:
+                    continue
+                if agregado["chaves"][0] != anterior:
+                    continue  # Agregado de outra carga: será recalculado na próxima consulta
+                
+                try:
+                    preparar = definicao["preparar"]
+                    if preparar is not None:
+                        removidas = preparar(removidas, *agregado["auxiliares"])
+                        adicionadas = preparar(adicionadas, *agregado["auxiliares"])
+                    self._acumular(definicao, agregado["celulas"], removidas, -1)
+                    self._acumular(definicao, agregado["celulas"], adicionadas, 1)
+                except Exception:
+                    del self._agregados[nome]  # Recalculado na próxima consulta
+                    continue
+                
+                agregado["chaves"] = (atual,) + agregado["chaves"][1:]
+                agregado["df"] = None
 
-@st.cache_data(ttl=3600)  # Aumentado para 1 hora
-def carregar_expansao() -> pd.DataFrame:
-    """Carrega os dados de expansão."""
-    df = load_data("Expansão")
-    
-    # Verificar e normalizar nomes de colunas
-    if not df.empty:
-        # Normalizar os nomes das colunas (remover espaços extras e converter para string)
-        df.columns = [col.strip() for col in df.columns]
+    def consultar(self, nome: str) -> tuple:
+        """
+        Retorna o agregado com as colunas das dimensões, 'Quantidade' e a coluna somada.
         
-        # Converter a coluna Unidade para string
-        if "Unidade" in df.columns:
-            df["Unidade"] = df["Unidade"].astype(str).str.strip()
+        Returns:
+            tuple: (DataFrame compartilhado, somente leitura; versão do agregado, que muda
+                   a cada carga das abas e a cada alteração aplicada)
+        """
+        definicao = AGREGADOS[nome]
+        # As abas são carregadas fora da trava: o cache avisa este objeto sob a trava da aba.
+        # Agregados com visão são montados a partir das linhas já preparadas da visão.
+        if definicao["visao"] is not None:
+            linhas, chaves, dados = self._cache.derivar_com_chave(
+                definicao["visao"], definicao["abas"], definicao["preparar"]
+            )
+        else:
+            dados, chaves = zip(*[self._cache.ler_com_chave(aba) for aba in definicao["abas"]])
+            linhas = dados[0]
         
-        # Garantir que a coluna Area seja numérica
-        if "Area" in df.columns:
-            df["Area"] = pd.to_numeric(df["Area"], errors='coerce').fillna(0)
-    
-    return df
+        with self._lock:
+            agregado = self._agregados.get(nome)
+            if agregado is None or agregado["chaves"] != chaves:
+                auxiliares = list(dados[1:])
+                celulas = {}
+                if not linhas.empty:
+                    self._acumular(definicao, celulas, linhas, 1)
+                agregado = {"chaves": chaves, "auxiliares": auxiliares, "celulas": celulas, "df": None}
+                self._agregados[nome] = agregado
+            
+            if agregado["df"] is None:
+                agregado["df"] = self._montar(definicao, agregado["celulas"])
+            return agregado["df"], agregado["chaves"]
+
+    @staticmethod
+    def _montar(definicao: dict, celulas: dict) -> pd.DataFrame:
+        df = pd.DataFrame(list(celulas), columns=definicao["dimensoes"])
+        for coluna in definicao["datas"]:
+            df[coluna] = pd.to_datetime(df[coluna])
+        df["Quantidade"] = [quantidade for quantidade, _ in celulas.values()]
+        if definicao["soma"]:
+            df[definicao["soma"]] = [total for _, total in celulas.values()]
+        return df
 
-@st.cache_data(ttl=3600)  # Aumentado para 1 hora
-def carregar_dados_pos() -> pd.DataFrame:
-    """Carrega os dados de pós-aplicação."""
-    df = load_data("Pós")
-    if not df.empty:
-        if "DATA" in df.columns:
-            df["DATA"] = pd.to_datetime(df["DATA"])
-        if "SETOR" in df.columns:
-            df["SETOR"] = pd.to_numeric(df["SETOR"], errors='coerce').fillna(0).astype(int)
-    return df
+@st.cache_resource
+def get_agregados() -> AgregadosIncrementais:
+    return AgregadosIncrementais(get_cache_dados())
 
-# Carregamento inicial dos dados
-df_tarefas = get_data("tarefas")
-df_extras = get_data("extras")
-df_auditoria = get_data("auditoria")
-df_reforma = get_data("reforma")
-df_expansao = get_data("expansao")
-df_base = get_data("base")
-df_pos = get_data("pos")
-
-# Converter tipos das colunas dos dados auxiliares, se necessário
-if not df_tarefas.empty and "Setor" in df_tarefas.columns:
-    df_tarefas["Setor"] = df_tarefas["Setor"].astype(int)
-
-if not df_base.empty and "Setor" in df_base.columns:
-    df_base["Setor"] = df_base["Setor"].astype(int)
-    # Mesclar dados auxiliares com tarefas, se necessário
-    if not df_tarefas.empty:
-        df_tarefas = pd.merge(
-            df_tarefas.copy(),
-            df_base.copy(),
-            on="Setor",
-            how="left"
-        )
-        df_tarefas['Area'] = df_tarefas['Area'].fillna(0).astype(int)
-        df_tarefas['Unidade'] = df_tarefas['Unidade'].fillna('Desconhecida')
+# Idade máxima (segundos) dos dados tolerada por página, quando menor que a da classe das abas
+TOLERANCIA_PAGINAS = {
+    "Reforma e Expansão": 120
+}
+
+# Abas usadas por cada página; apenas estas são carregadas antes de exibir a página.
+# Formulários que precisam de outras abas as carregam sob demanda.
+DEPENDENCIAS_PAGINAS = {
+    "Dashboard": ["Tarefas", "Base", "Pós"],
+    "Registrar": [],
+    "Atividades": ["Tarefas"],
+    "Reforma e Expansão": ["Reforma", "Expansão"],
+    "Auditoria": ["Auditoria"],
+    "Extras": ["AtividadesExtras"]
+}
+
+########################################## GRÁFICOS ##########################################
+
+# Quantidade máxima de figuras mantidas em memória (as usadas há mais tempo são descartadas)
+LIMITE_CACHE_FIGURAS = 64
+
+class CacheFiguras:
+    """
+    Cache LRU das figuras Plotly, compartilhado por todas as sessões.
+    
+    Cada figura é identificada pelo gráfico, pelos filtros que a definem e pela
+    versão dos dados usados; uma nova execução da página com os mesmos valores
+    reaproveita a figura pronta em vez de agrupar os dados e montá-la de novo.
+    As figuras retornadas não devem ser alteradas.
+    """
+    def __init__(self, limite: int):
+        self._limite = limite
+        self._lock = threading.Lock()
+        self._figuras = OrderedDict()
+
+    def obter(self, chave: tuple, construir):
+        """Retorna a figura da chave, montando-a com construir() se ela não estiver em cache."""
+        with self._lock:
+            figura = self._figuras.get(chave)
+            if figura is not None:
+                self._figuras.move_to_end(chave)
+                return figura
+        
+        # Montada fora da trava: sessões com outras figuras não aguardam
+        figura = construir()
+        with self._lock:
+            self._figuras[chave] = figura
+            self._figuras.move_to_end(chave)
+            while len(self._figuras) > self._limite:
+                self._figuras.popitem(last=False)
+        return figura
+
+@st.cache_resource
+def get_cache_figuras() -> CacheFiguras:
+    return CacheFiguras(LIMITE_CACHE_FIGURAS)
+
+def _congelar(valor):
+    """Converte filtros (dicionários, listas) em valores imutáveis, usáveis como chave."""
+    if isinstance(valor, dict):
+        return tuple(sorted((chave, _congelar(item)) for chave, item in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(item) for item in valor)
+    return valor
+
+def figura_em_cache(id_grafico: str, filtros, versao, construir):
+    """
+    Retorna a figura de um gráfico a partir do cache de figuras.
+    
+    Args:
+        id_grafico: Identificador do gráfico
+        filtros: Valores escolhidos pelo usuário que alteram o gráfico
+        versao: Versão dos dados usados (chave da aba ou do agregado)
+        construir: Função sem argumentos que monta a figura
+    """
+    return get_cache_figuras().obter((id_grafico, _congelar(filtros), versao), construir)
 
 ########################################## DASHBOARD ##########################################
 
 def dashboard():
     st.title("📊 Dashboard")
 
+    # Agregado das tarefas com 'Area' e 'Unidade' da Base (compartilhado, somente leitura)
     with st.spinner('Carregando dados...'):
-        df_tarefas = get_data("tarefas")
+        df_agregado, versao_agregado = get_agregados().consultar("tarefas")
     
-    # Se o DataFrame estiver vazio, exibe mensagem e retorna
-    if df_tarefas.empty:
+    # Se não houver tarefas, exibe mensagem e retorna
+    if df_agregado.empty:
         st.info("Nenhuma tarefa registrada.")
         return
 
-    # Mesclar com df_base (dados auxiliares vindos de CSV) para obter 'Area' e 'Unidade'
-    df_base = get_data("base")
-    # Certifique-se de que a coluna 'Setor' está com o mesmo tipo em ambos os DataFrames
-    df_tarefas["Setor"] = df_tarefas["Setor"].astype(int)
-    df_base["Setor"] = df_base["Setor"].astype(int)
-    
-    df_tarefas = df_tarefas.merge(df_base, on="Setor", how="left")
-    
-    # Tratar valores nulos
-    df_tarefas['Area'] = df_tarefas['Area'].fillna(0)
-    df_tarefas['Unidade'] = df_tarefas['Unidade'].fillna('Desconhecida')
-    
-    # Aplicar filtros (supondo que a função filtros_dashboard() esteja definida)
-    df_tarefas = filtros_dashboard(df_tarefas)
+    # Aplicar os filtros ao agregado (métricas e gráficos) e às linhas (tabela): com o
+    # espelho local as linhas são consultadas pelos índices, senão filtradas na visão
+    # compartilhada de tarefas
+    filtros = filtros_dashboard(df_agregado)
+    df_agregado = aplicar_filtros(df_agregado, filtros)
+    df_tarefas = consultar_espelho(
+        "Tarefas",
+        {"Data": (filtros["inicio"], filtros["fim"])},
+        {"Colaborador": filtros.get("colaboradores"), "Tipo": filtros.get("tipos")}
+    )
+    if df_tarefas is not None:
+        df_tarefas = enriquecer_tarefas(df_tarefas, get_cache_dados().ler("Base"))
+    else:
+        df_tarefas = aplicar_filtros(get_tarefas_enriquecidas(), filtros)
     
     # Exibe métricas
     col1, col2, col3 = st.columns(3)
     with col1:
-        total_area = df_tarefas['Area'].sum()
+        total_area = df_agregado['Area'].sum()
         formatted_area = f"{total_area:,.0f}".replace(',', '.')
         st.metric("Área Total", f"{formatted_area} ha")
     with col2:
-        st.metric("Quantidade de Atividades", df_tarefas['Colaborador'].size)
+        st.metric("Quantidade de Atividades", int(df_agregado['Quantidade'].sum()))
     with col3:
-        st.metric("Colaboradores", df_tarefas['Colaborador'].nunique())
+        st.metric("Colaboradores", df_agregado['Colaborador'].nunique())
     
     st.divider()
     
     # Layout com 2 colunas para gráficos
     col1, linha, col2 = st.columns([4, 0.5, 4])
     
-    # Gráfico: Atividades por Colaborador
-    with col1:
-        st.subheader("Atividades por Colaborador")
-        df_contagem_responsavel = df_tarefas.groupby(["Colaborador"])["Tipo"].count().reset_index()
+    # As figuras são reaproveitadas enquanto os filtros e o agregado não mudarem
+    def _grafico_responsavel():
+        df_contagem_responsavel = df_agregado.groupby("Colaborador")["Quantidade"].sum().reset_index()
         df_contagem_responsavel.columns = ["Colaborador", "Quantidade de Projetos"]
         df_contagem_responsavel = df_contagem_responsavel.sort_values(by="Quantidade de Projetos", ascending=False)
         fig_responsavel = px.bar(
@@ -569,12 +2491,10 @@ def dashboard():
             margin=dict(l=10, r=10, t=10, b=10),
             xaxis=dict(showgrid=False, showticklabels=False, title='', showline=False, zeroline=False)
         )
-        st.plotly_chart(fig_responsavel, use_container_width=True)
+        return fig_responsavel
     
-    # Gráfico: Quantidade de Projetos por Tipo
-    with col2:
-        st.subheader("Quantidade de Projetos por Tipo")
-        df_contagem_tipo = df_tarefas.groupby("Tipo")["Colaborador"].count().reset_index()
+    def _grafico_tipo():
+        df_contagem_tipo = df_agregado.groupby("Tipo")["Quantidade"].sum().reset_index()
         df_contagem_tipo.columns = ["Tipo", "Quantidade de Projetos"]
         df_contagem_tipo = df_contagem_tipo.sort_values(by="Quantidade de Projetos", ascending=False)
         fig_tipo = px.bar(
@@ -590,12 +2510,10 @@ def dashboard():
             margin=dict(l=10, r=10, t=10, b=10),
             yaxis=dict(showgrid=False, showticklabels=False, title='', showline=False, zeroline=False),
         )
-        st.plotly_chart(fig_tipo, use_container_width=True)
+        return fig_tipo
     
-    # Gráfico: Status dos Projetos
-    with col1:
-        st.subheader("Status dos Projetos")
-        df_contagem_status = df_tarefas.groupby("Status")["Tipo"].count().reset_index()
+    def _grafico_status():
+        df_contagem_status = df_agregado.groupby("Status")["Quantidade"].sum().reset_index()
         df_contagem_status.columns = ["Status", "Quantidade de Projetos"]
         df_contagem_status = df_contagem_status.sort_values(by="Quantidade de Projetos", ascending=False)
         fig_status = px.bar(
@@ -612,14 +2530,12 @@ def dashboard():
             margin=dict(l=10, r=10, t=10, b=10),
             xaxis=dict(showgrid=False, showticklabels=False, title='', showline=False, zeroline=False),
         )
-        st.plotly_chart(fig_status, use_container_width=True)
+        return fig_status
     
-    # Gráfico: Projetos por Unidade
-    with col2:
-        st.subheader("Projetos por Unidade")
-        df_contagem_unidade = df_tarefas.groupby("Unidade")["Tipo"].count().reset_index()
+    def _grafico_unidade():
+        df_contagem_unidade = df_agregado.groupby("Unidade")["Quantidade"].sum().reset_index()
         df_contagem_unidade.columns = ["Unidade", "Quantidade de Projetos"]
-        fig_pizza = px.pie(
+        return px.pie(
             df_contagem_unidade,
             names="Unidade",
             values="Quantidade de Projetos",
@@ -627,6 +2543,29 @@ def dashboard():
             hole=0.3,
             labels={'Quantidade de Projetos': 'Porcentagem de Projetos'}
         )
+    
+    # Gráfico: Atividades por Colaborador
+    with col1:
+        st.subheader("Atividades por Colaborador")
+        fig_responsavel = figura_em_cache("dashboard_colaborador", filtros, versao_agregado, _grafico_responsavel)
+        st.plotly_chart(fig_responsavel, use_container_width=True)
+    
+    # Gráfico: Quantidade de Projetos por Tipo
+    with col2:
+        st.subheader("Quantidade de Projetos por Tipo")
+        fig_tipo = figura_em_cache("dashboard_tipo", filtros, versao_agregado, _grafico_tipo)
+        st.plotly_chart(fig_tipo, use_container_width=True)
+    
+    # Gráfico: Status dos Projetos
+    with col1:
+        st.subheader("Status dos Projetos")
+        fig_status = figura_em_cache("dashboard_status", filtros, versao_agregado, _grafico_status)
+        st.plotly_chart(fig_status, use_container_width=True)
+    
+    # Gráfico: Projetos por Unidade
+    with col2:
+        st.subheader("Projetos por Unidade")
+        fig_pizza = figura_em_cache("dashboard_unidade", filtros, versao_agregado, _grafico_unidade)
         st.plotly_chart(fig_pizza, use_container_width=True)
     
     st.divider()
@@ -635,105 +2574,397 @@ def dashboard():
     st.subheader("Mapas de Pós-Aplicação")
     ordem_meses = ["Todos", "January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
     
-    mes_selecionado = st.selectbox(
-        "Selecione o Mês",
-        options=ordem_meses,
-        index=0
+    # Agregado da Pós-Aplicação por (mês, setor, operação, talhão), compartilhado e somente leitura
+    df_cubo_pos, versao_pos = get_agregados().consultar("pos")
+    
+    col_mes, col_operacao = st.columns(2)
+    with col_mes:
+        mes_selecionado = st.selectbox(
+            "Selecione o Mês",
+            options=ordem_meses,
+            index=0
+        )
+    with col_operacao:
+        operacoes = ["Todas"] + sorted(df_cubo_pos["DESC_OPERAÇÃO"].dropna().unique())
+        operacao_selecionada = st.selectbox("Selecione a Operação", options=operacoes, index=0)
+    
+    def _grafico_pos():
+        # Nome do mês pelo número (independente do locale do servidor), nos mesmos rótulos do filtro
+        df_cubo = df_cubo_pos.assign(**{"MÊS": df_cubo_pos["MES"].dt.month.map(dict(enumerate(ordem_meses)))})
+        
+        if mes_selecionado != "Todos":
+            df_cubo = df_cubo[df_cubo["MÊS"] == mes_selecionado]
+        if operacao_selecionada != "Todas":
+            df_cubo = df_cubo[df_cubo["DESC_OPERAÇÃO"] == operacao_selecionada]
+        
+        # Setores distintos e área aplicada por mês
+        df_contagem = df_cubo.groupby("MÊS").agg(
+            QUANTIDADE=("SETOR", "nunique"),
+            AREA=("AREA", "sum")
+        ).reset_index()
+            
+        fig_mes = px.bar(
+            df_contagem,
+            x="QUANTIDADE",
+            y="MÊS",
+            color="MÊS",
+            orientation="h",
+            text="QUANTIDADE",
+            hover_data={"AREA": ":,.0f"},
+            category_orders={"MÊS": ordem_meses}
+        )
+        fig_mes.update_traces(texttemplate="%{text}", textposition="outside")
+        fig_mes.update_layout(
+            showlegend=False,
+            margin=dict(l=10, r=10, t=10, b=10),
+            xaxis=dict(showgrid=False, showticklabels=False, title='', showline=False, zeroline=False),
+        )
+        return fig_mes
+    
+    fig_mes = figura_em_cache("dashboard_pos", (mes_selecionado, operacao_selecionada), versao_pos, _grafico_pos)
+    st.plotly_chart(fig_mes)
+    
+    st.divider()
+    
+    # Tabela
+    st.write("### Detalhes das Tarefas")
+    df_tarefas_ordenado = df_tarefas.sort_values(by="Data", ascending=False)
+    df_tarefas_display = df_tarefas_ordenado[["Data", "Setor", "Colaborador", "Tipo", "Status"]]
+    
+    # Criar um editor de dados
+    st.data_editor(
+        df_tarefas_display,
+        key="editor_tarefas",
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+            "Setor": st.column_config.NumberColumn("Setor", min_value=0, step=1, format="%d"),
+            "Colaborador": st.column_config.SelectboxColumn(
+                "Colaborador",
+                options=["Ana", "Camila", "Gustavo", "Maico", "Márcio", "Pedro", "Talita", "Washington", "Willian", "Iago"]
+            ),
+            "Tipo": st.column_config.SelectboxColumn(
+                "Tipo",
+                options=["Projeto de Sistematização", "Mapa de Sistematização", "LOC", "Projeto de Transbordo", "Projeto de Fertirrigação", "Projeto de Sulcação", 
+                        "Mapa de Pré-Plantio", "Mapa de Pós-Plantio", "Projeto de Colheita", "Mapa de Cadastro"]
+            ),
+            "Status": st.column_config.SelectboxColumn(
+                "Status",
+                options=["A fazer", "Em andamento", "A validar", "Concluído"]
+            ),
+            "DELETE": st.column_config.CheckboxColumn(
+                "Excluir",
+                help="Selecione para excluir a linha",
+                default=False
+            )
+        }
+    )
+
+    # Botão para salvar alterações
+    if st.button("Salvar Alterações"):
+        try:
+            # Gravar apenas as células, linhas novas e exclusões feitas no editor
+            if salvar_alteracoes_editor("editor_tarefas", df_tarefas_display, "Tarefas"):
+                st.success("Dados atualizados com sucesso!")
+                st.rerun()
+                
+        except Exception as e:
+            st.error(f"Erro ao salvar alterações: {str(e)}")
+
+########################################## REGISTRAR ##########################################
+
+def _caminho_checkpoint(nome_backup: str) -> str:
+    """Retorna o caminho do checkpoint associado a um backup de Pós-Aplicação."""
+    return os.path.splitext(nome_backup)[0] + ".checkpoint.json"
+
+def ler_checkpoint_pos(nome_backup: str) -> int:
+    """Retorna quantos registros do backup já foram enviados para a planilha."""
+    try:
+        with open(_caminho_checkpoint(nome_backup), encoding="utf-8") as arquivo:
+            return int(json.load(arquivo).get("enviados", 0))
+    except (OSError, ValueError):
+        return 0
+
+def gravar_checkpoint_pos(nome_backup: str, enviados: int):
+    """Registra o progresso do envio de um backup de Pós-Aplicação."""
+    caminho = _caminho_checkpoint(nome_backup)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump({"enviados": enviados, "atualizado_em": datetime.now().isoformat()}, arquivo)
+    # Substituição atômica para não corromper o checkpoint em caso de interrupção
+    os.replace(temporario, caminho)
+
+def ler_backup_pos(nome_backup: str) -> pd.DataFrame:
+    """Lê um backup de Pós-Aplicação mantendo os tipos usados no envio."""
+    return pd.read_csv(
+        nome_backup,
+        dtype={"DESC_OPERAÇÃO": str, "DATA": str, "TALHÃO": str, COLUNA_ID: str},
+        keep_default_na=False
     )
+
+def importar_pos(nome_backup: str, progress_callback=None) -> tuple:
+    """
+    Envia para a aba Pós os registros de um backup CSV, retomando do checkpoint.
+    
+    Cada lote é enviado com uma única chamada append_rows. O tamanho do lote
+    dobra quando a requisição é rápida e cai pela metade quando passa da
+    latência alvo. O checkpoint é gravado após cada lote confirmado.
+    
+    Args:
+        nome_backup: Caminho do backup CSV em PASTA_POS
+        progress_callback: Função opcional chamada com (enviados, total)
+        
+    Returns:
+        tuple: (registros enviados, total de registros)
+    """
+    registros = ler_backup_pos(nome_backup).to_dict("records")
+    total = len(registros)
+    enviados = min(ler_checkpoint_pos(nome_backup), total)
+    
+    if enviados < total:
+        registry = get_worksheet_registry()
+        worksheet = get_worksheet("Pós")
+        if worksheet is None:
+            return enviados, total
+        try:
+            headers = registry.headers("Pós")
+        except CotaIndisponivel:
+            st.warning("Limite de requisições ao Google Sheets atingido. Tente novamente em instantes.")
+            return enviados, total
+        
+        tamanho_lote = LOTE_POS_INICIAL
+        while enviados < total:
+            lote = registros[enviados:enviados + tamanho_lote]
+            linhas = [[_valor_para_planilha(registro.get(header, "")) for header in headers] for registro in lote]
+            
+            def _enviar_lote():
+                try:
+                    worksheet.append_rows(linhas)
+                    return True
+                except Exception as e:
+                    if _erro_de_cota(e):
+                        raise e  # Re-raise quota errors to the quota controller
+                    st.error(f"Erro ao enviar lote: {str(e)}")
+                    return False
+            
+            inicio = time.time()
+            if not executar_com_cota(_enviar_lote, "escrita"):
+                break
+            duracao = time.time() - inicio
+            
+            enviados += len(lote)
+            gravar_checkpoint_pos(nome_backup, enviados)
+            if progress_callback:
+                progress_callback(enviados, total)
+            
+            # Ajustar o tamanho do próximo lote à latência observada
+            if duracao < LATENCIA_ALVO_LOTE / 2:
+                tamanho_lote = min(tamanho_lote * 2, LOTE_POS_MAXIMO)
+            elif duracao > LATENCIA_ALVO_LOTE:
+                tamanho_lote = max(tamanho_lote // 2, LOTE_POS_MINIMO)
+        
+        invalidar_cache_aba("Pós")
+    
+    # Importação concluída: remover backup e checkpoint
+    if enviados >= total:
+        for caminho in (nome_backup, _caminho_checkpoint(nome_backup)):
+            if os.path.exists(caminho):
+                os.remove(caminho)
+    
+    return enviados, total
+
+# Quantidade máxima de registros novos/duplicados exibidos após o processamento
+LIMITE_EXIBICAO_POS = 1000
+# Quantidade máxima de processos usados para ler vários arquivos de Pós-Aplicação
+PROCESSOS_INGESTAO_POS = os.cpu_count() or 1
+
+# Colunas que identificam um registro de Pós-Aplicação
+CHAVE_POS = ["DESC_OPERAÇÃO", "DATA", "SETOR", "TALHÃO"]
+
+class DeduplicadorPos:
+    """
+    Separa registros de Pós-Aplicação em novos e duplicados, bloco a bloco.
+    
+    Um registro é duplicado quando sua chave (CHAVE_POS) já existe na aba Pós
+    ou em um registro novo anterior do mesmo envio. As chaves são indexadas
+    uma única vez e consultadas em bloco; as chaves dos registros novos são
+    acrescentadas ao índice após cada bloco.
+    """
+    def __init__(self, df_existente: pd.DataFrame):
+        self._chaves = None
+        if not df_existente.empty:
+            # Normalização dos dados existentes para comparação
+            self._chaves = pd.MultiIndex.from_arrays([
+                df_existente["DESC_OPERAÇÃO"].astype(str),
+                df_existente["DATA"].astype(str),
+                df_existente["SETOR"].astype(int),
+                df_existente["TALHÃO"].astype(str)
+            ])
+
+    def separar(self, df: pd.DataFrame) -> tuple:
+        """
+        Args:
+            df: Bloco de registros com as colunas padronizadas
+            
+        Returns:
+            tuple: (DataFrame de novos registros, DataFrame de registros duplicados)
+        """
+        # Normalização dos registros do bloco
+        registros = pd.DataFrame({
+            "DESC_OPERAÇÃO": df["DESC_OPERAÇÃO"].astype(str).str.strip(),
+            "DATA": df["DATA"].astype(str).str.strip(),
+            "SETOR": df["SETOR"].astype(int),
+            "TALHÃO": df["TALHÃO"].astype(str).str.strip(),
+            "AREA": df["AREA"].astype(float)
+        })
+        
+        # Duplicatas dentro do próprio bloco (a primeira ocorrência é mantida)
+        duplicado = registros.duplicated(subset=CHAVE_POS, keep="first").to_numpy()
+        chaves = pd.MultiIndex.from_frame(registros[CHAVE_POS])
+        if self._chaves is not None:
+            duplicado = duplicado | chaves.isin(self._chaves)
+        
+        novas_chaves = chaves[~duplicado]
+        self._chaves = novas_chaves if self._chaves is None else self._chaves.append(novas_chaves)
+        return registros[~duplicado], registros[duplicado]
+
+def processar_arquivos_pos(arquivos: list) -> list:
+    """
+    Lê e normaliza arquivos de Pós-Aplicação, um processo por arquivo.
+    
+    Cada arquivo é gravado em um CSV temporário (ver processar_arquivo_pos);
+    com um único arquivo a leitura é feita no próprio processo.
+    
+    Args:
+        arquivos: Arquivos enviados pelo usuário
+        
+    Returns:
+        list: Relatório de cada arquivo, na ordem em que foram enviados
+    """
+    os.makedirs(PASTA_POS, exist_ok=True)
+    prefixo = f"{PASTA_POS}/tmp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    tarefas = [
+        (arquivo.name, arquivo.getvalue(), f"{prefixo}_{indice}.csv")
+        for indice, arquivo in enumerate(arquivos)
+    ]
+    
+    if len(tarefas) == 1:
+        return [processar_arquivo_pos(*tarefas[0])]
+    
+    # Processos iniciados com "spawn" importam apenas o módulo de leitura, sem o Streamlit
+    with ProcessPoolExecutor(
+        max_workers=min(len(tarefas), PROCESSOS_INGESTAO_POS),
+        mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return list(executor.map(processar_arquivo_pos, *zip(*tarefas)))
+
+def ler_processados_pos(relatorios: list):
+    """
+    Lê em blocos os CSVs gerados por processar_arquivos_pos, removendo-os em seguida.
+    
+    Gera (posição do arquivo no envio, nome do arquivo, bloco). Arquivos cuja
+    leitura falhou são ignorados por completo.
+    """
+    for indice, relatorio in enumerate(relatorios):
+        if relatorio["caminho"] is None:
+            continue
+        if relatorio["erro"]:
+            os.remove(relatorio["caminho"])
+            continue
+        try:
+            for bloco in pd.read_csv(
+                relatorio["caminho"],
+                dtype={"DESC_OPERAÇÃO": str, "DATA": str, "TALHÃO": str},
+                keep_default_na=False,
+                chunksize=TAMANHO_BLOCO_EXCEL
+            ):
+                yield indice, relatorio["arquivo"], bloco
+        finally:
+            os.remove(relatorio["caminho"])
+
+def gravar_backup_pos(blocos) -> dict:
+    """
+    Separa os registros novos dos blocos lidos e os grava em um backup CSV.
+    
+    O backup é gravado bloco a bloco e também serve para retomar a importação.
+    
+    Args:
+        blocos: Iterável de (posição do arquivo no envio, nome do arquivo, DataFrame com
+                as colunas padronizadas)
+        
+    Returns:
+        dict: nome_backup (None se não houver registros novos), quantidades de
+              novos e duplicados (totais e por posição do arquivo no envio, já que
+              arquivos diferentes podem ter o mesmo nome) e amostras de cada um para exibição
+    """
+    deduplicador = DeduplicadorPos(get_cache_dados().ler("Pós"))
+    resumo = {
+        "nome_backup": None, "novos": 0, "duplicados": 0, "por_arquivo": {},
+        "amostra_novos": [], "amostra_duplicados": []
+    }
     
-    # Converter coluna DATA de df_pos para datetime e criar coluna MÊS
-    df_pos = get_data("pos")
-    df_pos["DATA"] = pd.to_datetime(df_pos["DATA"], errors="coerce")
-    df_pos["MÊS"] = df_pos["DATA"].dt.strftime("%B").str.capitalize()
+    for indice, nome_arquivo, bloco in blocos:
+        novos, duplicados = deduplicador.separar(bloco)
+        
+        if not novos.empty:
+            # O ID é gravado no backup para que seja o mesmo se o envio for retomado
+            com_id = novos.assign(**{COLUNA_ID: [novo_id() for _ in range(len(novos))]})
+            if resumo["nome_backup"] is None:
+                os.makedirs(PASTA_POS, exist_ok=True)
+                resumo["nome_backup"] = f"{PASTA_POS}/backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                com_id.to_csv(resumo["nome_backup"], index=False)
+            else:
+                com_id.to_csv(resumo["nome_backup"], mode="a", header=False, index=False)
+        
+        contagem = resumo["por_arquivo"].setdefault(indice, {"novos": 0, "duplicados": 0})
+        
+        # Guardar apenas uma amostra limitada para exibição
+        for tipo, registros in (("novos", novos), ("duplicados", duplicados)):
+            faltam = LIMITE_EXIBICAO_POS - sum(len(amostra) for amostra in resumo[f"amostra_{tipo}"])
+            if faltam > 0 and not registros.empty:
+                resumo[f"amostra_{tipo}"].append(registros.head(faltam).assign(ARQUIVO=nome_arquivo))
+            resumo[tipo] += len(registros)
+            contagem[tipo] += len(registros)
     
-    if mes_selecionado != "Todos":
-        df_filtrado = df_pos[df_pos["MÊS"] == mes_selecionado]
-    else:
-        df_filtrado = df_pos
+    for tipo in ("novos", "duplicados"):
+        amostras = resumo[f"amostra_{tipo}"]
+        resumo[f"amostra_{tipo}"] = pd.concat(amostras, ignore_index=True) if amostras else pd.DataFrame()
+    return resumo
+
+def executar_importacao_pos(nome_backup: str) -> bool:
+    """
+    Executa importar_pos exibindo barra de progresso e o resultado ao usuário.
     
-    df_unico = df_filtrado.drop_duplicates(subset=["MÊS", "SETOR"])
-    df_contagem = df_unico.groupby("MÊS").size().reset_index(name="QUANTIDADE")
+    Returns:
+        bool: True se todos os registros foram enviados
+    """
+    progress_bar = st.progress(0)
+    status_text = st.empty()
     
-    if df_contagem.shape[1] == 2:  
-        df_contagem.columns = ["MÊS", "QUANTIDADE"]
-    else:
-        st.error(f"Erro na contagem de meses: Estrutura inesperada -> {df_contagem.columns}")
-        
-    fig_mes = px.bar(
-        df_contagem,
-        x="QUANTIDADE",
-        y="MÊS",
-        color="MÊS",
-        orientation="h",
-        text="QUANTIDADE",
-        category_orders={"MÊS": ordem_meses}
-    )
-    fig_mes.update_traces(texttemplate="%{text}", textposition="outside")
-    fig_mes.update_layout(
-        showlegend=False,
-        margin=dict(l=10, r=10, t=10, b=10),
-        xaxis=dict(showgrid=False, showticklabels=False, title='', showline=False, zeroline=False),
-    )
-    st.plotly_chart(fig_mes)
+    def _atualizar_progresso(enviados, total):
+        progress_bar.progress(enviados / total)
+        status_text.text(f"Enviados {enviados} de {total} registros...")
     
-    st.divider()
+    try:
+        enviados, total = importar_pos(nome_backup, _atualizar_progresso)
+    except Exception as e:
+        st.error(f"Erro ao salvar registros: {str(e)}")
+        st.info(f"Um backup foi salvo em {nome_backup}. A importação pode ser retomada mais tarde.")
+        import traceback
+        st.expander("Detalhes do erro", expanded=False).code(traceback.format_exc())
+        return False
     
-    # Tabela
-    st.write("### Detalhes das Tarefas")
-    df_tarefas_ordenado = df_tarefas.sort_values(by="Data", ascending=False).reset_index(drop=True)
-    df_tarefas_display = df_tarefas_ordenado[["Data", "Setor", "Colaborador", "Tipo", "Status"]]
-    df_tarefas_display["Data"] = pd.to_datetime(df_tarefas_display["Data"], errors="coerce")
+    status_text.empty()
+    if enviados < total:
+        st.warning(f"⚠️ {enviados} de {total} registros foram salvos com sucesso. {total - enviados} registros não puderam ser salvos.")
+        st.info(f"Um backup foi salvo em {nome_backup}. A importação pode ser retomada mais tarde.")
+        return False
     
-    # Criar um editor de dados
-    df_editado = st.data_editor(
-        df_tarefas_display,
-        num_rows="dynamic",
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
-            "Setor": st.column_config.NumberColumn("Setor", min_value=0, step=1, format="%d"),
-            "Colaborador": st.column_config.SelectboxColumn(
-                "Colaborador",
-                options=["Ana", "Camila", "Gustavo", "Maico", "Márcio", "Pedro", "Talita", "Washington", "Willian", "Iago"]
-            ),
-            "Tipo": st.column_config.SelectboxColumn(
-                "Tipo",
-                options=["Projeto de Sistematização", "Mapa de Sistematização", "LOC", "Projeto de Transbordo", "Projeto de Fertirrigação", "Projeto de Sulcação", 
-                        "Mapa de Pré-Plantio", "Mapa de Pós-Plantio", "Projeto de Colheita", "Mapa de Cadastro"]
-            ),
-            "Status": st.column_config.SelectboxColumn(
-                "Status",
-                options=["A fazer", "Em andamento", "A validar", "Concluído"]
-            ),
-            "DELETE": st.column_config.CheckboxColumn(
-                "Excluir",
-                help="Selecione para excluir a linha",
-                default=False
-            )
-        }
-    )
-
-    # Botão para salvar alterações
-    if st.button("Salvar Alterações"):
-        try:
-            # Remover linhas marcadas para exclusão
-            if "DELETE" in df_editado.columns:
-                df_editado = df_editado[~df_editado["DELETE"]]
-                df_editado = df_editado.drop(columns=["DELETE"])
-            
-            # Converter datas para o formato correto
-            df_editado["Data"] = pd.to_datetime(df_editado["Data"], errors='coerce')
-            
-            # Atualizar a planilha
-            if update_sheet(df_editado, "Tarefas"):
-                st.success("Dados atualizados com sucesso!")
-                st.rerun()
-                
-        except Exception as e:
-            st.error(f"Erro ao salvar alterações: {str(e)}")
-
-########################################## REGISTRAR ##########################################
+    progress_bar.progress(1.0)
+    st.success(f"✅ {total} registros foram salvos com sucesso!")
+    return True
 
 def registrar_atividades():
     st.title("📝 Registrar")
@@ -890,6 +3121,7 @@ def registrar_atividades():
             use_container_width=True,
             hide_index=True,
             column_config={
+                COLUNA_ID: None,  # Identificador gerado pelo app, não editável
                 "Setor": st.column_config.NumberColumn(
                     "Setor",
                     min_value=0,
@@ -955,210 +3187,88 @@ def registrar_atividades():
 
     elif tipo_atividade == "Pós-Aplicação":
         st.subheader("Upload de Arquivo - Pós-Aplicação")
-        arquivo = st.file_uploader("Carregue um arquivo Excel", type=["xls", "xlsx"])
+        
+        # Importações interrompidas podem ser retomadas a partir do backup
+        for nome_backup in sorted(glob.glob(f"{PASTA_POS}/backup_*.csv")):
+            try:
+                total_backup = len(ler_backup_pos(nome_backup))
+            except Exception:
+                continue
+            enviados_backup = ler_checkpoint_pos(nome_backup)
+            st.info(f"Importação pendente: {os.path.basename(nome_backup)} ({enviados_backup} de {total_backup} registros enviados)")
+            if st.button("Retomar importação", key=f"retomar_{os.path.basename(nome_backup)}"):
+                executar_importacao_pos(nome_backup)
+        
+        arquivos = st.file_uploader("Carregue um ou mais arquivos Excel", type=["xls", "xlsx"], accept_multiple_files=True)
 
-        if arquivo:
+        if arquivos:
             try:
-                # Ler o arquivo Excel
-                df_original = pd.read_excel(arquivo)
-                
-                # Mapeamento de possíveis nomes de colunas
-                mapeamento_colunas = {
-                    "DESC_OPERAÇÃO": ["desc_operação", "desc_operacao", "descricao_operacao", "descricao", "operacao", "operação", "desc operação", "desc operacao", "tipo operacao", "tipo_operacao", "tipo de operação", "tipo_operação"],
-                    "DATA": ["data", "dt", "dt_operacao", "dt_operação", "data_operacao", "data_operação", "data operacao", "data operação", "date"],
-                    "SETOR": ["setor", "num_setor", "numero_setor", "nº setor", "n° setor", "n setor", "setor_num", "setor numero", "numero do setor"],
-                    "TALHÃO": ["talhão", "talhao", "talh", "num_talhao", "numero_talhao", "nº talhao", "n° talhao", "n talhao", "talhao_num", "talhao numero", "numero do talhao"],
-                    "AREA": ["area", "área", "hectares", "ha", "tamanho", "tam", "area_ha", "área_ha", "area(ha)", "área(ha)"]
-                }
-                
-                # Função para encontrar a coluna correspondente
-                def encontrar_coluna(df, nomes_possiveis):
-                    colunas_df = [col.lower().strip() for col in df.columns]
-                    for nome in nomes_possiveis:
-                        if nome.lower().strip() in colunas_df:
-                            idx = colunas_df.index(nome.lower().strip())
-                            return df.columns[idx]  # Retorna o nome original da coluna
-                    return None
-                
-                # Encontrar as colunas necessárias
-                colunas_encontradas = {}
-                colunas_nao_encontradas = []
-                
-                for coluna_padrao, alternativas in mapeamento_colunas.items():
-                    coluna_encontrada = encontrar_coluna(df_original, [coluna_padrao] + alternativas)
-                    if coluna_encontrada:
-                        colunas_encontradas[coluna_padrao] = coluna_encontrada
-                    else:
-                        colunas_nao_encontradas.append(coluna_padrao)
-                
-                # Verificar se todas as colunas necessárias foram encontradas
-                if colunas_nao_encontradas:
-                    st.error(f"Não foi possível encontrar as seguintes colunas obrigatórias: {', '.join(colunas_nao_encontradas)}")
-                    st.info("Verifique se a planilha contém estas informações com nomes diferentes e entre em contato com o suporte.")
-                    return
-                
-                # Criar um novo DataFrame com as colunas padronizadas
-                df = pd.DataFrame()
-                for coluna_padrao, coluna_original in colunas_encontradas.items():
-                    df[coluna_padrao] = df_original[coluna_original]
-                
-                # Processar dados
-                df["DATA"] = pd.to_datetime(df["DATA"], errors="coerce").dt.strftime("%Y-%m-%d")
-                df = df.dropna(subset=["DATA"])
-                df["SETOR"] = pd.to_numeric(df["SETOR"], errors='coerce').fillna(0).astype(int)
-                df["AREA"] = pd.to_numeric(df["AREA"], errors='coerce').fillna(0)
+                # Preview combinado a partir do primeiro bloco de cada arquivo
+                previews = []
+                for arquivo in arquivos:
+                    try:
+                        primeiro_bloco = next(ler_blocos_pos(arquivo), pd.DataFrame())
+                    except ValueError as e:
+                        st.error(f"{arquivo.name}: {e}")
+                        st.info("Verifique se a planilha contém estas informações com nomes diferentes e entre em contato com o suporte.")
+                        return
+                    previews.append(primeiro_bloco.head().assign(ARQUIVO=arquivo.name))
                 
                 # Mostrar preview dos dados processados
                 st.write("### Preview dos dados processados:")
-                st.dataframe(df.head())
+                st.dataframe(pd.concat(previews, ignore_index=True))
                 
                 # Salvar dados
                 if st.button("Salvar"):
-                    # Carregar dados existentes
-                    df_existente = get_data("pos")
+                    # Ler os arquivos em paralelo e separar novos e duplicados
+                    with st.spinner(f"Processando {len(arquivos)} arquivo(s)..."):
+                        relatorios = processar_arquivos_pos(arquivos)
+                        resumo = gravar_backup_pos(ler_processados_pos(relatorios))
                     
-                    # Preparar para análise de duplicatas
-                    novos_registros = []
-                    registros_duplicados = []
+                    # Relatório por arquivo
+                    st.write("### Arquivos processados:")
+                    st.dataframe(pd.DataFrame([
+                        {
+                            "Arquivo": relatorio["arquivo"],
+                            "Registros lidos": relatorio["registros"],
+                            "Novos": resumo["por_arquivo"].get(indice, {}).get("novos", 0),
+                            "Duplicados": resumo["por_arquivo"].get(indice, {}).get("duplicados", 0),
+                            "Tempo (s)": round(relatorio["duracao"], 1),
+                            "Erro": relatorio["erro"] or ""
+                        }
+                        for indice, relatorio in enumerate(relatorios)
+                    ]), hide_index=True)
                     
-                    # Verificar se há dados existentes
-                    if not df_existente.empty:
-                        # Converter para tipos adequados para comparação
-                        if "DATA" in df_existente.columns:
-                            df_existente["DATA"] = df_existente["DATA"].astype(str)
-                        if "SETOR" in df_existente.columns:
-                            df_existente["SETOR"] = df_existente["SETOR"].astype(int)
-                        if "DESC_OPERAÇÃO" in df_existente.columns:
-                            df_existente["DESC_OPERAÇÃO"] = df_existente["DESC_OPERAÇÃO"].astype(str)
-                        if "TALHÃO" in df_existente.columns:
-                            df_existente["TALHÃO"] = df_existente["TALHÃO"].astype(str)
+                    for relatorio in relatorios:
+                        if relatorio["erro"]:
+                            st.warning(f"{relatorio['arquivo']}: leitura interrompida, nenhum registro deste arquivo foi importado.")
                     
-                    # Verificar cada registro do arquivo
-                    for _, row in df.iterrows():
-                        # Criar o dicionário com os dados do registro
-                        dados = {
-                            "DESC_OPERAÇÃO": str(row["DESC_OPERAÇÃO"]).strip(),
-                            "DATA": str(row["DATA"]).strip(),
-                            "SETOR": int(row["SETOR"]),
-                            "TALHÃO": str(row["TALHÃO"]).strip(),
-                            "AREA": float(row["AREA"])
-                        }
-                        
-                        # Verificar se já existe no DataFrame existente
-                        duplicado = False
-                        
-                        if not df_existente.empty:
-                            # Criar máscara para cada coluna de comparação
-                            mask_desc = df_existente["DESC_OPERAÇÃO"] == dados["DESC_OPERAÇÃO"]
-                            mask_data = df_existente["DATA"] == dados["DATA"]
-                            mask_setor = df_existente["SETOR"] == dados["SETOR"]
-                            mask_talhao = df_existente["TALHÃO"] == dados["TALHÃO"]
-                            
-                            # Combinar todas as máscaras
-                            mask_completa = mask_desc & mask_data & mask_setor & mask_talhao
-                            
-                            # Verificar se existe algum registro que atenda a todas as condições
-                            duplicado = mask_completa.any()
-                        
-                        # Adicionar à lista apropriada
-                        if duplicado:
-                            registros_duplicados.append(dados)
-                        else:
-                            novos_registros.append(dados)
-                            # Adicionar ao DataFrame existente para evitar duplicatas no próprio arquivo
-                            novo_df = pd.DataFrame([dados])
-                            df_existente = pd.concat([df_existente, novo_df], ignore_index=True)
-            
                     # Salvar novos registros
-                    total_registros = len(novos_registros) + len(registros_duplicados)
-                    
-                    if novos_registros:
-                        # Definir tamanho do lote para envio
-                        tamanho_lote = 20  # Ajuste este valor conforme necessário
-                        total_lotes = (len(novos_registros) + tamanho_lote - 1) // tamanho_lote
-                        
-                        # Criar um DataFrame para backup local
-                        df_backup = pd.DataFrame(novos_registros)
-                        
-                        # Salvar backup local em caso de falha
-                        os.makedirs(PASTA_POS, exist_ok=True)
-                        nome_backup = f"{PASTA_POS}/backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                        df_backup.to_csv(nome_backup, index=False)
-                        
-                        # Inicializar contadores
-                        registros_salvos = 0
-                        falhas = 0
-                        
-                        # Criar barra de progresso
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        
-                        try:
-                            # Processar em lotes
-                            for i in range(0, len(novos_registros), tamanho_lote):
-                                # Obter o lote atual
-                                lote_atual = novos_registros[i:i+tamanho_lote]
-                                lote_num = i // tamanho_lote + 1
-                                
-                                # Atualizar status
-                                status_text.text(f"Processando lote {lote_num} de {total_lotes} ({len(lote_atual)} registros)...")
-                                
-                                # Enviar lote para o Google Sheets
-                                for dados in lote_atual:
-                                    sucesso = append_to_sheet(dados, "Pós")
-                                    if sucesso:
-                                        registros_salvos += 1
-                                    else:
-                                        falhas += 1
-                                
-                                # Atualizar barra de progresso
-                                progress_bar.progress((i + len(lote_atual)) / len(novos_registros))
-                                
-                                # Pausa entre lotes para evitar limites de API
-                                if i + tamanho_lote < len(novos_registros):
-                                    time.sleep(1)  # Pausa de 1 segundo entre lotes
-                            
-                            # Limpar cache para forçar recarregamento dos dados
-                            clear_data_cache("pos")
-                            
-                            # Mostrar mensagem de sucesso com detalhes
-                            progress_bar.progress(1.0)
-                            status_text.empty()
-                            
-                            if falhas > 0:
-                                st.warning(f"⚠️ {registros_salvos} de {len(novos_registros)} registros foram salvos com sucesso. {falhas} registros não puderam ser salvos.")
-                                st.info(f"Um backup foi salvo em {nome_backup} para que você possa tentar novamente mais tarde.")
-                            else:
-                                st.success(f"✅ {registros_salvos} de {total_registros} registros foram salvos com sucesso!")
-                                # Remover arquivo de backup se tudo deu certo
-                                if os.path.exists(nome_backup):
-                                    os.remove(nome_backup)
-                        
-                        except Exception as e:
-                            # Em caso de erro, mostrar mensagem e informações sobre o backup
-                            st.error(f"Erro ao salvar registros: {str(e)}")
-                            st.info(f"Um backup foi salvo em {nome_backup} para que você possa tentar novamente mais tarde.")
-                            import traceback
-                            st.expander("Detalhes do erro", expanded=False).code(traceback.format_exc())
+                    if resumo["nome_backup"]:
+                        gravar_checkpoint_pos(resumo["nome_backup"], 0)
+                        executar_importacao_pos(resumo["nome_backup"])
                     else:
                         st.warning("Nenhum novo registro para salvar.")
                     
                     # Mostrar novos registros e duplicados
                     col1, col2 = st.columns(2)
                     with col1:
-                        with st.expander(f"Novos registros ({len(novos_registros)})"):
-                            if novos_registros:
-                                st.dataframe(pd.DataFrame(novos_registros))
+                        with st.expander(f"Novos registros ({resumo['novos']})"):
+                            if resumo["novos"]:
+                                st.dataframe(resumo["amostra_novos"])
                             else:
                                 st.write("Nenhum novo registro")
                     
                     with col2:
-                        with st.expander(f"Registros duplicados ({len(registros_duplicados)})"):
-                            if registros_duplicados:
-                                st.dataframe(pd.DataFrame(registros_duplicados))
+                        with st.expander(f"Registros duplicados ({resumo['duplicados']})"):
+                            if resumo["duplicados"]:
+                                st.dataframe(resumo["amostra_duplicados"])
                             else:
                                 st.write("Nenhum registro duplicado")
                     
+                    if max(resumo["novos"], resumo["duplicados"]) > LIMITE_EXIBICAO_POS:
+                        st.caption(f"Exibidos no máximo {LIMITE_EXIBICAO_POS} registros de cada tipo.")
+                    
             except Exception as e:
                 st.error(f"Erro ao processar arquivo: {str(e)}")
                 import traceback
@@ -1282,7 +3392,6 @@ def registrar_atividades():
                     
                     if append_to_sheet(nova_auditoria, "Auditoria"):
                         st.success(f"Auditoria do setor {Setor} registrada com sucesso!")
-                        st.cache_data.clear()
                     else:
                         st.error("Erro ao registrar a auditoria. Por favor, tente novamente.")
                         
@@ -1291,6 +3400,26 @@ def registrar_atividades():
 
 ########################################## ATIVIDADES ##########################################
 
+# Cards exibidos por coluna do quadro (e acrescentados a cada "Carregar mais")
+CARDS_POR_PAGINA = 20
+
+def chaves_cards(df: pd.DataFrame) -> list:
+    """
+    Chaves dos cards do quadro, derivadas do ID de cada tarefa (ou do seu conteúdo,
+    se ela ainda não tiver ID) e não do índice do DataFrame, que muda quando linhas
+    são excluídas ou a aba é recarregada. Chaves repetidas recebem um sufixo com a
+    ordem de ocorrência.
+    """
+    chaves = []
+    ocorrencias = {}
+    colunas = [col for col in ["Data", "Setor", "Colaborador", "Tipo", "Status"] if col in df.columns]
+    ids = df[COLUNA_ID].fillna("").astype(str) if COLUNA_ID in df.columns else pd.Series("", index=df.index)
+    for id_tarefa, valores in zip(ids, df[colunas].itertuples(index=False, name=None)):
+        resumo = id_tarefa or hashlib.sha1("|".join(map(str, valores)).encode("utf-8")).hexdigest()[:12]
+        ocorrencias[resumo] = ocorrencias.get(resumo, 0) + 1
+        chaves.append(f"card_{resumo}_{ocorrencias[resumo]}")
+    return chaves
+
 # Função para exibir os projetos como cards clicáveis
 def tarefas_semanais():
     st.title("📂 Atividades")
@@ -1331,19 +3460,18 @@ def tarefas_semanais():
     </style>
     """, unsafe_allow_html=True)
 
-    # Carregar os dados de tarefas
-    df_tarefas = get_data("tarefas")
+    # Carregar os dados de tarefas (compartilhados, somente leitura)
+    df_tarefas = get_cache_dados().ler("Tarefas")
 
     # Verificar se há dados
     if df_tarefas.empty:
         st.info("Nenhuma atividade registrada.")
         return
 
-    # Aplicando os filtros e retornando o DataFrame filtrado
-    df_tarefas = filtros_atividades(df_tarefas)
-
-    # Converter a coluna 'Setor' para inteiro, se possível
-    df_tarefas.loc[:, "Setor"] = pd.to_numeric(df_tarefas["Setor"], errors="coerce").astype("Int64")
+    # Período selecionado na barra lateral; as linhas são consultadas pelos índices
+    # do espelho local (Data e Setor), se ativo, ou selecionadas nos dados em cache
+    intervalos = filtros_atividades(df_tarefas)
+    df_periodo = filtrar_linhas("Tarefas", df_tarefas, intervalos)
 
     # Criar duas colunas para os filtros
     col_filtro1, col_filtro2 = st.columns(2)
@@ -1352,7 +3480,7 @@ def tarefas_semanais():
         # Filtro de Setor
         filtro_setor = st.selectbox(
             "🔍 Filtrar por Setor",
-            options=[""] + sorted(df_tarefas["Setor"].dropna().unique().tolist()),
+            options=[""] + sorted(df_periodo["Setor"].dropna().unique().tolist()),
             index=0
         )
 
@@ -1360,30 +3488,43 @@ def tarefas_semanais():
         # Filtro de Colaborador
         filtro_colaborador = st.selectbox(
             "👤 Filtrar por Colaborador",
-            options=[""] + sorted(df_tarefas["Colaborador"].dropna().astype(str).unique().tolist()),
+            options=[""] + sorted(df_periodo["Colaborador"].dropna().astype(str).unique().tolist()),
             index=0
         )
 
-    # Aplicar os filtros sequencialmente
-    if filtro_setor:
-        df_tarefas = df_tarefas[df_tarefas["Setor"] == filtro_setor]
-        
-    if filtro_colaborador:
-        df_tarefas = df_tarefas[df_tarefas["Colaborador"] == filtro_colaborador]
+    # Aplicar os filtros de setor e colaborador junto com o período
+    if filtro_setor or filtro_colaborador:
+        df_tarefas = filtrar_linhas("Tarefas", df_tarefas, intervalos, {
+            "Setor": [filtro_setor] if filtro_setor else None,
+            "Colaborador": [filtro_colaborador] if filtro_colaborador else None
+        })
+    else:
+        df_tarefas = df_periodo
 
     # Definir os status possíveis e seus ícones
     status_colunas = ["A fazer", "Em andamento", "A validar", "Concluído"]
     status_icones = ["📋", "⏳", "✅", "🏆"]
     
+    # Agrupar tarefas por status (mais recentes primeiro)
+    df_tarefas = df_tarefas.sort_values(by="Data", ascending=False)
+    tarefas_por_status = {status: df_tarefas[df_tarefas["Status"] == status] for status in status_colunas}
+    
+    # Cards visíveis por coluna, mantidos entre as execuções da página enquanto os
+    # filtros não mudarem (novos filtros voltam a exibir a primeira página de cards)
+    filtros_ativos = hash(_congelar({"periodo": intervalos, "setor": filtro_setor, "colaborador": filtro_colaborador}))
+    if st.session_state.get("cards_visiveis", {}).get("filtros") != filtros_ativos:
+        st.session_state["cards_visiveis"] = {"filtros": filtros_ativos, "colunas": {}}
+    visiveis = st.session_state["cards_visiveis"]["colunas"]
+    
     # Criar 4 colunas para os diferentes status
     colunas = st.columns(4)
     
-    # Adicionar títulos estilizados às colunas
+    # Adicionar títulos estilizados às colunas, com a quantidade de atividades
     for i, (status, icone) in enumerate(zip(status_colunas, status_icones)):
         with colunas[i]:
             st.markdown(f"""
             <div class="status-header">
-                {icone} {status}
+                {icone} {status} ({len(tarefas_por_status[status])})
             </div>
             """, unsafe_allow_html=True)
             
@@ -1393,28 +3534,36 @@ def tarefas_semanais():
                 <div class="column-divider"></div>
                 """, unsafe_allow_html=True)
     
-    # Agrupar tarefas por status
-    tarefas_por_status = {status: df_tarefas[df_tarefas["Status"] == status] for status in status_colunas}
-    
-    # Track if any card is clicked
-    clicked_card = None
-    
-    # Exibir cards em cada coluna correspondente ao status
+    # Exibir cards em cada coluna correspondente ao status, uma página por vez
     for i, status in enumerate(status_colunas):
         with colunas[i]:
-            if tarefas_por_status[status].empty:
+            tarefas_status = tarefas_por_status[status]
+            if tarefas_status.empty:
                 st.info(f"Nenhuma atividade com status '{status}'")
-            else:
-                # Criar um container para manter os cards alinhados
-                for j, row in tarefas_por_status[status].iterrows():
-                    # Criar um botão estilizado como card
-                    if st.button(
-                        f"Setor {row['Setor']} | {row['Colaborador']} | {row['Tipo']}",
-                        key=f"card_{status}_{j}",
-                        use_container_width=True,
-                    ):
-                        st.session_state["projeto_selecionado"] = row.to_dict()
-                        st.rerun()
+                continue
+            
+            # Concluídas ficam recolhidas por padrão
+            if status == "Concluído" and not st.toggle("Mostrar concluídas", key="mostrar_concluidas"):
+                continue
+            
+            limite = visiveis.get(status, CARDS_POR_PAGINA)
+            pagina = tarefas_status.head(limite)
+            for chave, (_, row) in zip(chaves_cards(pagina), pagina.iterrows()):
+                # Criar um botão estilizado como card
+                if st.button(
+                    f"Setor {row['Setor']} | {row['Colaborador']} | {row['Tipo']}",
+                    key=chave,
+                    use_container_width=True,
+                ):
+                    st.session_state["projeto_selecionado"] = row.to_dict()
+                    st.rerun()
+            
+            restantes = len(tarefas_status) - len(pagina)
+            if restantes > 0:
+                st.caption(f"Exibindo {len(pagina)} de {len(tarefas_status)}")
+                if st.button(f"Carregar mais ({restantes})", key=f"carregar_mais_{status}", use_container_width=True):
+                    visiveis[status] = limite + CARDS_POR_PAGINA
+                    st.rerun()
 
 # Verificar se um projeto foi selecionado
 if "projeto_selecionado" in st.session_state:
@@ -1435,7 +3584,8 @@ if "projeto_selecionado" in st.session_state:
     
     # Formulário de edição
     with st.form(key="edt_form"):
-            Data = st.date_input("Data", value=datetime.today().date())
+            data_tarefa = pd.to_datetime(tarefa.get("Data"), errors="coerce")
+            Data = st.date_input("Data", value=data_tarefa.date() if not pd.isna(data_tarefa) else datetime.today().date())
             Setor = st.number_input("Setor", value=tarefa["Setor"])
             Colaborador = st.selectbox("Colaborador", options=["", "Ana", "Camila", "Gustavo", "Maico", "Márcio", "Pedro", "Talita", "Washington", "Willian", "Iago"], 
                                      index=["", "Ana", "Camila", "Gustavo", "Maico", "Márcio", "Pedro", "Talita", "Washington", "Willian", "Iago"].index(tarefa["Colaborador"]))
@@ -1444,223 +3594,150 @@ if "projeto_selecionado" in st.session_state:
             Status = st.selectbox("Status", options=["", "A fazer", "Em andamento", "A validar", "Concluído"],
                                 index=["", "A fazer", "Em andamento", "A validar", "Concluído"].index(tarefa["Status"]))
 
+            # A tarefa é localizada pelo ID (coluna atribuída por garantir_ids)
+            id_tarefa = str(tarefa.get(COLUNA_ID) or "")
+
             col1, col2 = st.columns(2)
             with col1:
                 if st.form_submit_button("Salvar Alterações"):
                     try:
-                        df = get_data("tarefas")
-                        mask = (df['Data'] == tarefa['Data']) & (df['Setor'] == tarefa['Setor']) & (df['Colaborador'] == tarefa['Colaborador']) & (df['Tipo'] == tarefa['Tipo'])
-                        if mask.any():
-                            df.loc[mask, ['Data', 'Setor', 'Colaborador', 'Tipo', 'Status']] = [str(Data), Setor, Colaborador, Tipo, Status]
-                            update_sheet(df, "Tarefas")
+                        # Gravar apenas os campos alterados, somente na linha da tarefa
+                        novos_valores = {"Data": str(Data), "Setor": Setor, "Colaborador": Colaborador, "Tipo": Tipo, "Status": Status}
+                        alterados = {
+                            coluna: valor for coluna, valor in novos_valores.items()
+                            if _valor_para_planilha(valor, coluna == "Data") != _valor_para_planilha(tarefa.get(coluna), coluna == "Data")
+                        }
+                        if not id_tarefa:
+                            st.error("A tarefa ainda não tem ID. Recarregue a página e tente novamente.")
+                        elif not alterados:
+                            st.info("Nenhuma alteração para salvar.")
+                        elif atualizar_linha("Tarefas", id_tarefa, alterados):
                             st.success("Atividade atualizada com sucesso!")
                             st.session_state.pop("projeto_selecionado", None)
-                        else:
-                            st.error("Não foi possível encontrar a atividade para atualizar.")
                     except Exception as e:
                         st.error(f"Erro ao atualizar: {str(e)}")
                 
                 if st.form_submit_button("🗑️ Excluir Tarefa"):
                     try:
-                        df = get_data("tarefas")
-                        mask = (df['Data'] == tarefa['Data']) & (df['Setor'] == tarefa['Setor']) & (df['Colaborador'] == tarefa['Colaborador']) & (df['Tipo'] == tarefa['Tipo'])
-                        if mask.any():
-                            df = df[~mask]
-                            update_sheet(df, "Tarefas")
+                        if not id_tarefa:
+                            st.error("A tarefa ainda não tem ID. Recarregue a página e tente novamente.")
+                        elif excluir_linha("Tarefas", id_tarefa):
                             st.success("Tarefa excluída com sucesso!")
                             st.session_state.pop("projeto_selecionado", None)
-                        else:
-                            st.error("Não foi possível encontrar a tarefa para excluir.")
                     except Exception as e:
                         st.error(f"Erro ao excluir: {str(e)}")
 
 ########################################## REFORMA E EXPANSÃO ##########################################
 
+# Categorias acompanhadas: categoria -> (coluna, texto que indica a categoria)
+CATEGORIAS_PROGRESSO = {
+    "Em andamento": ("Projeto", "EM ANDAMENTO"),
+    "Realizado": ("Projeto", "OK"),
+    "Aprovado": ("Aprovado", "OK"),
+    "Sistematizacao": ("Sistematizacao", "OK"),
+    "Loc": ("Loc", "OK"),
+    "Pre-Plantio": ("Pre_Plantio", "OK")
+}
+
+# Código da unidade na planilha -> nome exibido
+UNIDADES_PROGRESSO = {"21": "Paraguaçu", "22": "Narandiba"}
+
+def calcular_progresso(dados: dict) -> dict:
+    """
+    Calcula o percentual da área de cada unidade em cada categoria de acompanhamento.
+    
+    Os indicadores de todas as categorias são avaliados uma vez por coluna e as
+    áreas de todos os tipos de acompanhamento são somadas em um único groupby
+    por (tipo, unidade). O Grupo Cocal é a área da categoria dividida pela área
+    total das duas unidades, ou seja, a média ponderada pela área.
+    
+    Args:
+        dados: Tipo de acompanhamento ("Reforma", "Expansão") -> DataFrame já filtrado
+        
+    Returns:
+        dict: Tipo -> DataFrame com a coluna Categoria e os percentuais (0 a 100)
+              de cada unidade e do Grupo Cocal
+    """
+    categorias = list(CATEGORIAS_PROGRESSO)
+    areas = []
+    for tipo, df in dados.items():
+        df = df[df["Unidade"].isin(list(UNIDADES_PROGRESSO))]
+        
+        # Área de cada linha em cada categoria (0 quando a linha não está na categoria)
+        indicadores = {}
+        for categoria, (coluna, texto) in CATEGORIAS_PROGRESSO.items():
+            if coluna in df.columns:
+                indicadores[categoria] = df[coluna].astype(str).str.contains(texto, case=False, na=False)
+            else:
+                indicadores[categoria] = False
+        area = pd.DataFrame(indicadores, index=df.index).mul(df["Area"], axis=0)
+        area["Total"] = df["Area"]
+        area["Tipo"] = tipo
+        area["Unidade"] = df["Unidade"].map(UNIDADES_PROGRESSO)
+        areas.append(area)
+    
+    if not areas:
+        return {}
+    
+    somas = pd.concat(areas).groupby(["Tipo", "Unidade"]).sum()
+    
+    progresso = {}
+    for tipo in dados:
+        somas_tipo = somas.xs(tipo, level="Tipo") if tipo in somas.index.get_level_values("Tipo") else somas.iloc[0:0]
+        somas_tipo = somas_tipo.reindex(list(UNIDADES_PROGRESSO.values()), fill_value=0)
+        somas_tipo.loc["Grupo Cocal"] = somas_tipo.sum()
+        
+        total = somas_tipo["Total"].where(somas_tipo["Total"] > 0)
+        percentuais = somas_tipo[categorias].div(total, axis=0).fillna(0) * 100
+        progresso[tipo] = percentuais.T.rename_axis(index="Categoria", columns=None).reset_index()
+    return progresso
+
+# Valores exibidos quando não há dados válidos na planilha
+PROGRESSO_EXEMPLO = {
+    "Reforma": pd.DataFrame({
+        "Categoria": list(CATEGORIAS_PROGRESSO),
+        "Paraguaçu": [45.0, 30.0, 20.0, 15.0, 10.0, 5.0],
+        "Narandiba": [40.0, 25.0, 15.0, 10.0, 5.0, 0.0],
+        "Grupo Cocal": [42.5, 27.5, 17.5, 12.5, 7.5, 2.5]
+    }),
+    "Expansão": pd.DataFrame({
+        "Categoria": list(CATEGORIAS_PROGRESSO),
+        "Paraguaçu": [35.0, 25.0, 15.0, 10.0, 5.0, 0.0],
+        "Narandiba": [30.0, 20.0, 10.0, 5.0, 0.0, 0.0],
+        "Grupo Cocal": [32.5, 22.5, 12.5, 7.5, 2.5, 0.0]
+    })
+}
+
 # Página de Acompanhamento Reforma e Expansão
 def acompanhamento_reforma_expansao():
     st.title("🌱 Reforma e Expansão")
 
-    # Lista de categorias e colunas correspondentes no DataFrame
-    categorias = ["Em andamento", "Realizado", "Aprovado", "Sistematizacao", "Loc", "Pre-Plantio"]
-    colunas = ["Projeto", "Projeto", "Aprovado", "Sistematizacao", "Loc", "Pre_Plantio"]
-
-    # Criar dicionários para armazenar os valores
-    data_reforma = {"Categoria": categorias}
-    data_expansao = {"Categoria": categorias}
-
     try:
-        ######################## REFORMA ########################
-        # Limpar o cache para garantir dados atualizados
-        st.cache_data.clear()
-        
-        # Carregar dados de reforma
-        df_reforma = get_data("reforma")
-        
-        # Verificar se o DataFrame está vazio ou se não tem dados válidos
-        has_valid_data = not df_reforma.empty and "Area" in df_reforma.columns and df_reforma["Area"].sum() > 0
-        
-        if has_valid_data:
-            # Processar dados para cada unidade
-            for unidade, nome in zip(["21", "22"], ["Paraguaçu", "Narandiba"]):
-                # Verificar se a coluna Unidade existe
-                if "Unidade" not in df_reforma.columns:
-                    st.error(f"Coluna 'Unidade' não encontrada no DataFrame de Reforma")
-                    continue
-                
-                # Filtrar por unidade (já convertida para string na função carregar_reforma)
-                unidade_filtro = df_reforma["Unidade"] == unidade
-                
-                # Verificar se a coluna Plano existe
-                plano_filtro = df_reforma["Plano"].str.contains("Plano A", case=False, na=False) if "Plano" in df_reforma.columns else pd.Series(True, index=df_reforma.index)
-                
-                # Combinar filtros
-                filtro_final = unidade_filtro & plano_filtro
-                
-                # Calcular área total da unidade
-                unidade_area = df_reforma[filtro_final]["Area"].sum()
-                
-                # Processar cada categoria
-                valores_reforma = []
-                for coluna, categoria in zip(colunas, categorias):
-                    try:
-                        # Aplicar filtros específicos para cada categoria
-                        if categoria == "Em andamento":
-                            # Verificar se a coluna Projeto existe
-                            if "Projeto" in df_reforma.columns:
-                                filtro = df_reforma["Projeto"].str.contains("EM ANDAMENTO", case=False, na=False)
-                            else:
-                                filtro = pd.Series(False, index=df_reforma.index)
-                        elif categoria == "Realizado":
-                            # Verificar se a coluna Projeto existe
-                            if "Projeto" in df_reforma.columns:
-                                filtro = df_reforma["Projeto"].str.contains("OK", case=False, na=False)
-                            else:
-                                filtro = pd.Series(False, index=df_reforma.index)
-                        else:
-                            # Verificar se a coluna específica existe
-                            if coluna in df_reforma.columns:
-                                filtro = df_reforma[coluna].str.contains("OK", case=False, na=False)
-                            else:
-                                filtro = pd.Series(False, index=df_reforma.index)
-                        
-                        # Calcular área e porcentagem
-                        area_categoria = df_reforma[filtro_final & filtro]["Area"].sum()
-                        
-                        # Calcular porcentagem
-                        porcentagem = (area_categoria / unidade_area) * 100 if unidade_area > 0 else 0
-                        valores_reforma.append(f"{porcentagem:.0f}%")
-                    except Exception as e:
-                        valores_reforma.append("0%")
-                
-                # Armazenar valores para esta unidade
-                data_reforma[nome] = valores_reforma
-        else:
-            # Criar dados de exemplo se não houver dados válidos
-            st.warning("Não foram encontrados dados válidos para Reforma. Exibindo dados de exemplo.")
-            for nome, valores in zip(["Paraguaçu", "Narandiba"], [
-                ["45%", "30%", "20%", "15%", "10%", "5%"],
-                ["40%", "25%", "15%", "10%", "5%", "0%"]
-            ]):
-                data_reforma[nome] = valores
-        
-        # Calcular a média das porcentagens para cada categoria
-        media_grupo_cocal_reforma = []
-        for i in range(len(categorias)):
-            try:
-                # Extrair valores numéricos
-                valor_paraguacu = float(data_reforma["Paraguaçu"][i].replace("%", "").replace(",", "."))
-                valor_narandiba = float(data_reforma["Narandiba"][i].replace("%", "").replace(",", "."))
-                
-                # Calcular média
-                media = (valor_paraguacu + valor_narandiba) / 2
-                media_grupo_cocal_reforma.append(f"{media:.0f}%")
-            except Exception:
-                media_grupo_cocal_reforma.append("0%")
+        # Carregar dados de reforma e expansão (somente leitura) e as chaves das cargas
+        df_reforma, versao_reforma = get_cache_dados().ler_com_chave("Reforma")
+        df_expansao, versao_expansao = get_cache_dados().ler_com_chave("Expansão")
         
-        # Adicionar coluna com a média
-        data_reforma["Grupo Cocal"] = media_grupo_cocal_reforma
+        dados_validos = {}
+        for tipo, df in (("Reforma", df_reforma), ("Expansão", df_expansao)):
+            # Verificar se o DataFrame está vazio ou se não tem dados válidos
+            if df.empty or "Area" not in df.columns or df["Area"].sum() <= 0:
+                continue
+            if "Unidade" not in df.columns:
+                st.error(f"Coluna 'Unidade' não encontrada no DataFrame de {tipo}")
+                continue
+            dados_validos[tipo] = df
         
-        ######################## EXPANSÃO ########################
-        # Carregar dados de expansão
-        df_expansao = get_data("expansao")
+        # Reforma considera apenas os setores do Plano A
+        if "Reforma" in dados_validos and "Plano" in df_reforma.columns:
+            dados_validos["Reforma"] = df_reforma[df_reforma["Plano"].str.contains("Plano A", case=False, na=False)]
         
-        # Verificar se o DataFrame está vazio ou se não tem dados válidos
-        has_valid_data = not df_expansao.empty and "Area" in df_expansao.columns and df_expansao["Area"].sum() > 0
+        progresso = calcular_progresso(dados_validos)
         
-        if has_valid_data:
-            # Processar dados para cada unidade
-            for unidade, nome in zip(["21", "22"], ["Paraguaçu", "Narandiba"]):
-                # Verificar se a coluna Unidade existe
-                if "Unidade" not in df_expansao.columns:
-                    st.error(f"Coluna 'Unidade' não encontrada no DataFrame de Expansão")
-                    continue
-                
-                # Filtrar por unidade (já convertida para string na função carregar_expansao)
-                unidade_filtro = df_expansao["Unidade"] == unidade
-                
-                # Calcular área total da unidade
-                unidade_area = df_expansao[unidade_filtro]["Area"].sum()
-                
-                # Processar cada categoria
-                valores_expansao = []
-                for coluna, categoria in zip(colunas, categorias):
-                    try:
-                        # Aplicar filtros específicos para cada categoria
-                        if categoria == "Em andamento":
-                            # Verificar se a coluna Projeto existe
-                            if "Projeto" in df_expansao.columns:
-                                filtro = df_expansao["Projeto"].str.contains("EM ANDAMENTO", case=False, na=False)
-                            else:
-                                filtro = pd.Series(False, index=df_expansao.index)
-                        elif categoria == "Realizado":
-                            # Verificar se a coluna Projeto existe
-                            if "Projeto" in df_expansao.columns:
-                                filtro = df_expansao["Projeto"].str.contains("OK", case=False, na=False)
-                            else:
-                                filtro = pd.Series(False, index=df_expansao.index)
-                        else:
-                            # Verificar se a coluna específica existe
-                            if coluna in df_expansao.columns:
-                                filtro = df_expansao[coluna].str.contains("OK", case=False, na=False)
-                            else:
-                                filtro = pd.Series(False, index=df_expansao.index)
-                        
-                        # Calcular área e porcentagem
-                        area_categoria = df_expansao[unidade_filtro & filtro]["Area"].sum()
-                        
-                        # Calcular porcentagem
-                        porcentagem = (area_categoria / unidade_area) * 100 if unidade_area > 0 else 0
-                        valores_expansao.append(f"{porcentagem:.0f}%")
-                    except Exception as e:
-                        valores_expansao.append("0%")
-                
-                # Armazenar valores para esta unidade
-                data_expansao[nome] = valores_expansao
-        else:
-            # Criar dados de exemplo se não houver dados válidos
-            st.warning("Não foram encontrados dados válidos para Passagem. Exibindo dados de exemplo.")
-            for nome, valores in zip(["Paraguaçu", "Narandiba"], [
-                ["35%", "25%", "15%", "10%", "5%", "0%"],
-                ["30%", "20%", "10%", "5%", "0%", "0%"]
-            ]):
-                data_expansao[nome] = valores
-        
-        # Calcular a média das porcentagens para cada categoria
-        media_grupo_cocal_expansao = []
-        for i in range(len(categorias)):
-            try:
-                # Extrair valores numéricos
-                valor_paraguacu = float(data_expansao["Paraguaçu"][i].replace("%", "").replace(",", "."))
-                valor_narandiba = float(data_expansao["Narandiba"][i].replace("%", "").replace(",", "."))
-                
-                # Calcular média
-                media = (valor_paraguacu + valor_narandiba) / 2
-                media_grupo_cocal_expansao.append(f"{media:.0f}%")
-            except Exception:
-                media_grupo_cocal_expansao.append("0%")
-        
-        # Adicionar coluna com a média
-        data_expansao["Grupo Cocal"] = media_grupo_cocal_expansao
+        # Criar dados de exemplo se não houver dados válidos
+        for tipo, nome_exibicao in (("Reforma", "Reforma"), ("Expansão", "Passagem")):
+            if tipo not in progresso:
+                st.warning(f"Não foram encontrados dados válidos para {nome_exibicao}. Exibindo dados de exemplo.")
+                progresso[tipo] = PROGRESSO_EXEMPLO[tipo]
         
         ######################## GRÁFICO ########################
         # Divide a tela em 2 colunas
@@ -1672,40 +3749,40 @@ def acompanhamento_reforma_expansao():
         with col2:
             opcao_visualizacao = st.selectbox("Selecione a unidade:", ["Grupo Cocal", "Paraguaçu", "Narandiba"])
 
-        # Escolher qual DataFrame usar com base na seleção
-        if opcao_tipo == "Reforma":
-            df_selecionado = pd.DataFrame(data_reforma)[["Categoria", opcao_visualizacao]]
-        else:
-            df_selecionado = pd.DataFrame(data_expansao)[["Categoria", opcao_visualizacao]]
-
-        df_selecionado = df_selecionado.rename(columns={opcao_visualizacao: "Porcentagem"})
-
-        # Convertendo os valores de string para número
-        df_selecionado["Porcentagem"] = df_selecionado["Porcentagem"].str.replace("%", "").str.replace(",", ".").astype(float)
+        # Gráfico reaproveitado enquanto a seleção e os dados das abas não mudarem
+        def _grafico_progresso():
+            # Mesma tabela de progresso usada nas métricas, já numérica
+            df_selecionado = progresso[opcao_tipo][["Categoria", opcao_visualizacao]].rename(
+                columns={opcao_visualizacao: "Porcentagem"}
+            )
 
-        # Criando o gráfico dinâmico
-        fig = px.bar(
-            df_selecionado,
-            x="Porcentagem",
-            y="Categoria",
-            orientation="h",
-            text="Porcentagem",
-            labels={"Porcentagem": "Porcentagem (%)", "Categoria": "Categoria"},
-        )
+            # Criando o gráfico dinâmico
+            fig = px.bar(
+                df_selecionado,
+                x="Porcentagem",
+                y="Categoria",
+                orientation="h",
+                text="Porcentagem",
+                labels={"Porcentagem": "Porcentagem (%)", "Categoria": "Categoria"},
+            )
 
-        # Adicionar esta linha para fixar o eixo X até 100%
-        fig.update_xaxes(range=[0, 105])
+            # Adicionar esta linha para fixar o eixo X até 100%
+            fig.update_xaxes(range=[0, 105])
 
-        fig.update_traces(marker_color="#76b82a", texttemplate="%{text:.0f}%", textposition='outside')
+            fig.update_traces(marker_color="#76b82a", texttemplate="%{text:.0f}%", textposition='outside')
 
-        fig.update_layout(
-            showlegend=False,  
-            xaxis=dict(showgrid=False, showticklabels=True, title='Porcentagem (%)', showline=False, zeroline=False),
-            yaxis=dict(showgrid=False, showticklabels=True, title='', showline=False, zeroline=False),
-        )
+            fig.update_layout(
+                showlegend=False,  
+                xaxis=dict(showgrid=False, showticklabels=True, title='Porcentagem (%)', showline=False, zeroline=False),
+                yaxis=dict(showgrid=False, showticklabels=True, title='', showline=False, zeroline=False),
+            )
+            return fig
 
         # Exibir o gráfico dinâmico no Streamlit
         st.subheader(f"Acompanhamento de {opcao_tipo} - {opcao_visualizacao}")
+        fig = figura_em_cache(
+            "reforma_progresso", (opcao_tipo, opcao_visualizacao), (versao_reforma, versao_expansao), _grafico_progresso
+        )
         st.plotly_chart(fig)
 
         ####################### MAPA ########################
@@ -1881,17 +3958,21 @@ def acompanhamento_reforma_expansao():
         ####################### TABELAS ########################
         st.divider()
 
+        # Percentuais exibidos sem casas decimais
+        formato_percentual = {
+            coluna: st.column_config.NumberColumn(coluna, format="%.0f%%")
+            for coluna in list(UNIDADES_PROGRESSO.values()) + ["Grupo Cocal"]
+        }
+
         # Métricas de Reforma
         st.write("### Métricas de Reforma")
-        df_metrica_reforma = pd.DataFrame(data_reforma)
-        st.dataframe(df_metrica_reforma, use_container_width=True, hide_index=True)
+        st.dataframe(progresso["Reforma"], use_container_width=True, hide_index=True, column_config=formato_percentual)
 
         st.divider()
 
         # Métricas de Expansão
         st.write("### Métricas de Expansão")
-        df_metrica_expansao = pd.DataFrame(data_expansao)
-        st.dataframe(df_metrica_expansao, use_container_width=True, hide_index=True)
+        st.dataframe(progresso["Expansão"], use_container_width=True, hide_index=True, column_config=formato_percentual)
         
     except Exception as e:
         st.error(f"Erro ao processar dados: {e}")
@@ -1904,115 +3985,125 @@ def acompanhamento_reforma_expansao():
 ########################################## AUDITORIA ##########################################
 
 # Função para calcular a aderência
-def calcular_aderencia(planejado, executado):
-    # Se os valores são strings (não numéricos)
-    if isinstance(planejado, str) or isinstance(executado, str):
-        # Remover espaços e converter para minúsculas para comparação
-        planejado_str = str(planejado).strip().lower()
-        executado_str = str(executado).strip().lower()
-        
-        # Se ambos estão vazios, considerar 100% de aderência
-        if not planejado_str and not executado_str:
-            return 100
-        # Se um está vazio e outro não, considerar 0% de aderência
-        if not planejado_str or not executado_str:
-            return 0
-        # Se são iguais, 100% de aderência
-        if planejado_str == executado_str:
-            return 100
-        # Se são diferentes, 0% de aderência
-        return 0
+def calcular_aderencias(df: pd.DataFrame, colunas_planejado: list) -> pd.DataFrame:
+    """
+    Calcula a aderência (0 a 100) entre cada coluna _Planejado e a _Executado correspondente.
     
-    # Para valores numéricos
-    try:
-        planejado_num = float(planejado)
-        executado_num = float(executado)
-
-        if planejado_num == 0 and executado_num == 0:
-            return 100
-        if planejado_num == 0 or executado_num == 0:
-            return 0
-
-        menor = min(planejado_num, executado_num)
-        maior = max(planejado_num, executado_num)
-        return (menor / maior) * 100
+    Todos os pares são calculados de uma vez, em matrizes:
+    - se algum dos valores não é numérico, os textos são comparados sem espaços
+      nas extremidades e sem diferenciar maiúsculas: ambos vazios ou iguais = 100,
+      caso contrário = 0 (células ausentes são tratadas como vazias);
+    - se ambos são numéricos: ambos zero = 100, apenas um zero = 0, caso
+      contrário a razão entre o menor e o maior valor.
+    
+    Returns:
+        DataFrame com uma coluna Aderência_<item> para cada par, com o índice de df
+    """
+    colunas_executado = [col.replace("_Planejado", "_Executado") for col in colunas_planejado]
+    planejado = df[colunas_planejado]
+    executado = df[colunas_executado]
+    
+    # Valores numéricos (NaN para textos e vazios)
+    planejado_num = planejado.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    executado_num = executado.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
     
-    except (ValueError, TypeError):
-        # Se houver erro na conversão, tratar como strings
-        return 100 if str(planejado).strip().lower() == str(executado).strip().lower() else 0
+    # Valores normalizados para a comparação de textos
+    def _normalizar(valores: pd.DataFrame) -> np.ndarray:
+        textos = valores.astype(object).where(valores.notna(), "").astype(str)
+        return textos.apply(lambda col: col.str.strip().str.lower()).to_numpy(dtype=object)
+    
+    planejado_txt = _normalizar(planejado)
+    executado_txt = _normalizar(executado)
+    
+    # Aderência por texto
+    planejado_vazio = planejado_txt == ""
+    executado_vazio = executado_txt == ""
+    aderencia_texto = np.where(
+        planejado_vazio & executado_vazio, 100.0,
+        np.where(planejado_vazio | executado_vazio, 0.0, np.where(planejado_txt == executado_txt, 100.0, 0.0))
+    )
+    
+    # Aderência numérica
+    with np.errstate(divide="ignore", invalid="ignore"):
+        razao = np.minimum(planejado_num, executado_num) / np.maximum(planejado_num, executado_num) * 100
+    planejado_zero = planejado_num == 0
+    executado_zero = executado_num == 0
+    aderencia_numerica = np.where(
+        planejado_zero & executado_zero, 100.0,
+        np.where(planejado_zero | executado_zero, 0.0, razao)
+    )
+    
+    numerico = ~np.isnan(planejado_num) & ~np.isnan(executado_num)
+    return pd.DataFrame(
+        np.where(numerico, aderencia_numerica, aderencia_texto),
+        index=df.index,
+        columns=[f"Aderência_{col.replace('_Planejado', '')}" for col in colunas_planejado]
+    )
 
 # Página de Auditoria
 def auditoria():
     st.title("🔍 Auditoria")
 
-    # Carregar os dados do banco de dados
-    df_auditoria = get_data("auditoria")
+    # Carregar os dados do banco de dados (cópia) e a chave da carga, usada no cache do gráfico
+    df_auditoria, versao_auditoria = get_cache_dados().ler_com_chave("Auditoria")
+    df_auditoria = df_auditoria.copy()
 
     # Criar novas colunas de aderência para o DataFrame filtrado
     colunas_planejado = [col for col in df_auditoria.columns if "_Planejado" in col]
-    colunas_executado = [col.replace("_Planejado", "_Executado") for col in colunas_planejado]
 
-    # Aplicar a função calcular_aderencia para cada linha do DataFrame filtrado
-    for planejado, executado in zip(colunas_planejado, colunas_executado):
-        df_auditoria[f"Aderência_{planejado.replace('_Planejado', '')}"] = df_auditoria.apply(
-            lambda row: calcular_aderencia(row[planejado], row[executado]), axis=1
-        )
+    # Calcular a aderência de todos os itens de uma vez
+    if colunas_planejado:
+        df_aderencia = calcular_aderencias(df_auditoria, colunas_planejado)
+        df_auditoria[df_aderencia.columns] = df_aderencia
+
+    # Gráfico reaproveitado enquanto os dados da aba não mudarem
+    def _grafico_aderencia():
+        # Calcular a média de cada item de aderência (como "Aderência_Levantes", "Aderência_Bigodes", etc.)
+        colunas_aderencia = [col for col in df_auditoria.columns if "Aderência" in col]
+
+        df_media_itens = df_auditoria[colunas_aderencia].mean().reset_index()
+        df_media_itens.columns = ["Item", "Média Aderência (%)"]
+
+        # Dicionário para renomear os itens
+        renomear_itens = {
+            "Aderência_Levantes": "Levantes",
+            "Aderência_Bigodes": "Bigodes",
+            "Aderência_TipoPlantio": "Tipo de plantio",
+            "Aderência_TipoTerraco": "Tipo de terraço",
+            "Aderência_QuantidadeTerraco": "Quantidade de terraço",
+            "Aderência_LevantesDesmanche": "Levantes para desmanche",
+            "Aderência_BigodesDesmanche": "Bigodes para desmanche",
+            "Aderência_Carreadores": "Carreadores"
+        }
 
-    # Criar tabela formatada
-    colunas_tabela = ["Unidade", "Setor"] + colunas_planejado + colunas_executado + [f"Aderência_{col.replace('_Planejado', '')}" for col in colunas_planejado]
-    df_tabela = df_auditoria[colunas_tabela]
-
-    # Identificar colunas numéricas e formatá-las corretamente
-    colunas_numericas = df_tabela.select_dtypes(include=["number"]).columns
-
-    # Formatar os valores numéricos diretamente no DataFrame
-    for col in colunas_numericas:
-        df_tabela[col] = df_tabela[col].apply(lambda x: f"{x:.0f}")
-
-    # Calcular a média de cada item de aderência (como "Aderência_Levantes", "Aderência_Bigodes", etc.)
-    colunas_aderencia = [col for col in df_auditoria.columns if "Aderência" in col]
-
-    df_media_itens = df_auditoria[colunas_aderencia].mean().reset_index()
-    df_media_itens.columns = ["Item", "Média Aderência (%)"]
-
-    # Dicionário para renomear os itens
-    renomear_itens = {
-        "Aderência_Levantes": "Levantes",
-        "Aderência_Bigodes": "Bigodes",
-        "Aderência_TipoPlantio": "Tipo de plantio",
-        "Aderência_TipoTerraco": "Tipo de terraço",
-        "Aderência_QuantidadeTerraco": "Quantidade de terraço",
-        "Aderência_LevantesDesmanche": "Levantes para desmanche",
-        "Aderência_BigodesDesmanche": "Bigodes para desmanche",
-        "Aderência_Carreadores": "Carreadores"
-    }
+        # Renomear os itens de acordo com o dicionário
+        df_media_itens["Item"] = df_media_itens["Item"].map(renomear_itens).fillna(df_media_itens["Item"])
 
-    # Renomear os itens de acordo com o dicionário
-    df_media_itens["Item"] = df_media_itens["Item"].map(renomear_itens).fillna(df_media_itens["Item"])
-
-    # Criar gráfico de barras horizontais com a média de cada item
-    fig_aderencia = px.bar(df_media_itens, 
-                        x="Item",                 
-                        y="Média Aderência (%)",  
-                        text="Média Aderência (%)",
-                        orientation="v",         
-                        color="Item",             
-                        color_discrete_sequence=px.colors.qualitative.Set1,  
-                        )
+        # Criar gráfico de barras horizontais com a média de cada item
+        fig_aderencia = px.bar(df_media_itens, 
+                            x="Item",                 
+                            y="Média Aderência (%)",  
+                            text="Média Aderência (%)",
+                            orientation="v",         
+                            color="Item",             
+                            color_discrete_sequence=px.colors.qualitative.Set1,  
+                            )
 
-    # Ajustar a posição do rótulo para fora da barra
-    fig_aderencia.update_traces(textposition='outside')
+        # Ajustar a posição do rótulo para fora da barra
+        fig_aderencia.update_traces(textposition='outside')
 
-    # Ajustar os valores no gráfico para mostrar sem casas decimais
-    fig_aderencia.update_traces(texttemplate='%{text:.0f}%')
+        # Ajustar os valores no gráfico para mostrar sem casas decimais
+        fig_aderencia.update_traces(texttemplate='%{text:.0f}%')
 
-    fig_aderencia.update_layout(
-        showlegend=False,  
-        xaxis=dict(showgrid=False, showticklabels=True, title='', showline=False, zeroline=False),
-        yaxis=dict(showgrid=False, showticklabels=False, showline=False, zeroline=False))
+        fig_aderencia.update_layout(
+            showlegend=False,  
+            xaxis=dict(showgrid=False, showticklabels=True, title='', showline=False, zeroline=False),
+            yaxis=dict(showgrid=False, showticklabels=False, showline=False, zeroline=False))
+        return fig_aderencia
 
     # Exibir gráfico
     st.write("### Aderência")
+    fig_aderencia = figura_em_cache("auditoria_aderencia", None, versao_auditoria, _grafico_aderencia)
     st.plotly_chart(fig_aderencia, use_container_width=True)
 
     st.divider()
@@ -2020,15 +4111,17 @@ def auditoria():
     # Tabela de auditoria
     st.write("### Detalhes das Auditorias")
     df_auditoria_display = df_auditoria
-    df_auditoria_display["Data"] = pd.to_datetime(df_auditoria_display["Data"]).dt.strftime("%d/%m/%Y")
     
     # Criar um editor de dados com funcionalidade de exclusão de linhas
-    df_editado = st.data_editor(
+    st.data_editor(
         df_auditoria_display,
+        key="editor_auditoria",
         num_rows="dynamic",
         use_container_width=True,
         hide_index=True,
         column_config={
+            COLUNA_ID: None,  # Identificador gerado pelo app, não editável
+            "Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
             "DELETE": st.column_config.CheckboxColumn(
                 "Excluir",
                 help="Selecione para excluir a linha",
@@ -2044,29 +4137,8 @@ def auditoria():
     # Botão para salvar alterações
     if st.button("Salvar Alterações"):
         try:
-            # Remover linhas marcadas para exclusão
-            if "DELETE" in df_editado.columns:
-                df_editado = df_editado[~df_editado["DELETE"]]
-                df_editado = df_editado.drop(columns=["DELETE"])
-            
-            # Converter colunas de data para o formato 'yyyy-mm-dd
-            for col in df_editado.columns:
-                if 'data' in col.lower():
-                    df_editado[col] = pd.to_datetime(df_editado[col], errors='coerce').dt.strftime('%Y-%m-%d')
-                    # # Adiciona apenas um apóstrofo no início da string
-                    # df_editado[col] = "'" + df_editado[col]
-            
-            # Atualizar a planilha
-            worksheet = get_worksheet("Auditoria")
-            if worksheet is not None:
-                # Limpar e reescrever todos os dados
-                worksheet.clear()
-                headers = df_editado.columns.tolist()
-                worksheet.append_row(headers)
-                worksheet.append_rows(df_editado.values.tolist())
-                
-                # Limpar o cache e mostrar mensagem de sucesso
-                st.cache_data.clear()
+            # Gravar apenas as células, linhas novas e exclusões feitas no editor
+            if salvar_alteracoes_editor("editor_auditoria", df_auditoria_display, "Auditoria"):
                 st.success("Dados atualizados com sucesso!")
                 st.rerun()
         except Exception as e:
@@ -2086,14 +4158,15 @@ def atividades_extras():
         st.info("Nenhuma atividade extra registrada.")
         return
     
-    # Aplicando os filtros e retornando o DataFrame filtrado
-    df_extras = filtros_extras(df_extras)
+    # Aplicando os filtros às linhas (tabela) e ao agregado (gráficos)
+    filtros = filtros_extras(df_extras)
+    df_extras = aplicar_filtros(df_extras, filtros)
+    df_agregado, versao_agregado = get_agregados().consultar("extras")
+    df_agregado = aplicar_filtros(df_agregado, filtros)
     
-    # Gráfico 1: Quantidade de Atividades por Colaborador
-    col1, linha, col2 = st.columns([4, 0.5, 4])
-
-    with col1:
-        atividade_colab = df_extras.groupby('Colaborador').size().reset_index(name="Quantidade de Atividades")
+    # As figuras são reaproveitadas enquanto os filtros e o agregado não mudarem
+    def _grafico_colaborador():
+        atividade_colab = df_agregado.groupby('Colaborador')["Quantidade"].sum().reset_index(name="Quantidade de Atividades")
         atividade_colab = atividade_colab.sort_values(by="Quantidade de Atividades", ascending=False)
         fig_colab = px.bar(
             atividade_colab, 
@@ -2110,11 +4183,10 @@ def atividades_extras():
             yaxis=dict(showgrid=False, showticklabels=False, title='', showline=False, zeroline=False),
             title_font_size=24
         )
-        st.plotly_chart(fig_colab, use_container_width=True)
+        return fig_colab
     
-    # Gráfico 2: Quantidade de Atividades por Setor Solicitante
-    with col2:
-        atividade_setor = df_extras.groupby('SetorSolicitante').size().reset_index(name="Quantidade de Atividades")
+    def _grafico_setor():
+        atividade_setor = df_agregado.groupby('SetorSolicitante')["Quantidade"].sum().reset_index(name="Quantidade de Atividades")
         fig_setor = px.pie(
             atividade_setor, 
             names="SetorSolicitante", 
@@ -2126,18 +4198,31 @@ def atividades_extras():
             title_font_size=24
         )
         fig_setor.update_traces(textinfo="value")  # Mostrar os valores absolutos (quantidade)
+        return fig_setor
+    
+    # Gráfico 1: Quantidade de Atividades por Colaborador
+    col1, linha, col2 = st.columns([4, 0.5, 4])
+
+    with col1:
+        fig_colab = figura_em_cache("extras_colaborador", filtros, versao_agregado, _grafico_colaborador)
+        st.plotly_chart(fig_colab, use_container_width=True)
+    
+    # Gráfico 2: Quantidade de Atividades por Setor Solicitante
+    with col2:
+        fig_setor = figura_em_cache("extras_setor", filtros, versao_agregado, _grafico_setor)
         st.plotly_chart(fig_setor, use_container_width=True)
     
     # Tabela
     st.write("### Detalhes das Atividades")
 
     # Ordenar e preparar dataframe
-    df_extras_ordenado = df_extras.sort_values(by="Data", ascending=False).reset_index(drop=True)
+    df_extras_ordenado = df_extras.sort_values(by="Data", ascending=False)
     atividades_realizadas = df_extras_ordenado[["Data", "Colaborador", "Atividade", "Solicitante", "SetorSolicitante", "Horas"]]
 
     # Criar um editor de dados
-    df_editado = st.data_editor(
+    st.data_editor(
         atividades_realizadas,
+        key="editor_extras",
         num_rows="dynamic",
         use_container_width=True,
         hide_index=True,
@@ -2176,16 +4261,8 @@ def atividades_extras():
     # Botão para salvar alterações
     if st.button("Salvar Alterações"):
         try:
-            # Remover linhas marcadas para exclusão
-            if "DELETE" in df_editado.columns:
-                df_editado = df_editado[~df_editado["DELETE"]]
-                df_editado = df_editado.drop(columns=["DELETE"])
-            
-            # Converter formatos para compatibilidade
-            df_editado["Data"] = pd.to_datetime(df_editado["Data"], errors='coerce')
-            
-            # Atualizar a planilha
-            if update_sheet(df_editado, "AtividadesExtras"):
+            # Gravar apenas as células, linhas novas e exclusões feitas no editor
+            if salvar_alteracoes_editor("editor_extras", atividades_realizadas, "AtividadesExtras"):
                 st.success("Dados atualizados com sucesso!")
                 st.rerun()
                 
@@ -2194,12 +4271,19 @@ def atividades_extras():
 
 ########################################## FILTROS ##########################################
 
+def aplicar_filtros(df, filtros):
+    """Seleciona as linhas (ou as células de um agregado) dentro dos filtros escolhidos na barra lateral."""
+    selecao = (df["Data"] >= filtros["inicio"]) & (df["Data"] <= filtros["fim"])
+    if filtros.get("colaboradores") is not None:
+        selecao = selecao & df["Colaborador"].isin(filtros["colaboradores"])
+    if filtros.get("tipos") is not None:
+        selecao = selecao & df["Tipo"].isin(filtros["tipos"])
+    return df[selecao]
+
 # Função para filtros da aba Dashboard
 def filtros_dashboard(df):
-    df = df.copy()  # Trabalhar com uma cópia para não afetar o DataFrame original
-    if not df.empty:
-        df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
-
+    # df é o agregado compartilhado de tarefas: as opções vêm dele e os filtros escolhidos
+    # são devolvidos para serem aplicados com aplicar_filtros
     st.sidebar.title("Filtros")
 
     # Verificar se há dados
@@ -2235,12 +4319,12 @@ def filtros_dashboard(df):
     data_inicio = pd.to_datetime(data_inicio)
     data_fim = pd.to_datetime(data_fim)
 
-    # Filtrando o DataFrame com base nas datas selecionadas
+    # Colaboradores e tipos presentes no intervalo de datas selecionado
     df_tarefas = df[(df["Data"] >= data_inicio) & 
                             (df["Data"] <= data_fim)]
     
     # Filtro de Colaborador
-    colaboradores_unicos = df_tarefas["Colaborador"].unique()  # Obter a lista de colaboradores únicos
+    colaboradores_unicos = df_tarefas["Colaborador"].dropna().unique()  # Obter a lista de colaboradores únicos
     colaboradores_unicos = ["Todos"] + list(colaboradores_unicos)  # Adiciona a opção "Todos"
     
     # Selecionando apenas "Todos" inicialmente
@@ -2251,7 +4335,7 @@ def filtros_dashboard(df):
     )
 
         # Filtro de Tipo com opção de "Todos"
-    tipos_unicos = df_tarefas["Tipo"].unique()  # Obter a lista de tipos únicos
+    tipos_unicos = df_tarefas["Tipo"].dropna().unique()  # Obter a lista de tipos únicos
     tipos_unicos = ["Todos"] + list(tipos_unicos)  # Adiciona a opção "Todos"
     
     # Selecionando apenas "Todos" inicialmente
@@ -2261,35 +4345,25 @@ def filtros_dashboard(df):
         default=["Todos"]  # Seleciona apenas "Todos" por padrão
     )
 
-    # Filtrando o DataFrame com base no(s) colaborador(es) selecionado(s)
-    if "Todos" in colaboradores_selecionados:
-        # Se "Todos" estiver selecionado, não filtra por colaborador
-        df_tarefas = df_tarefas
-    else:
-        df_tarefas = df_tarefas[df_tarefas["Colaborador"].isin(colaboradores_selecionados)]
-    
-    # Filtrando o DataFrame com base no(s) tipo(s) selecionado(s)
-    if "Todos" in tipos_selecionados:
-        # Se "Todos" estiver selecionado, não filtra por tipo
-        df_tarefas = df_tarefas
-    else:
-        df_tarefas = df_tarefas[df_tarefas["Tipo"].isin(tipos_selecionados)]
-
-    return df_tarefas
+    # Se "Todos" estiver selecionado, não filtra por colaborador / tipo
+    return {
+        "inicio": data_inicio,
+        "fim": data_fim,
+        "colaboradores": None if "Todos" in colaboradores_selecionados else colaboradores_selecionados,
+        "tipos": None if "Todos" in tipos_selecionados else tipos_selecionados
+    }
 
 def filtros_atividades(df_tarefas):
+    # Retorna o período escolhido ({coluna: (início, fim)}), aplicado pela página com filtrar_linhas
     st.sidebar.header("Filtros")
 
     if df_tarefas.empty:
-        return df_tarefas
-    
-    # Converter coluna Data para datetime
-    df_tarefas['Data'] = pd.to_datetime(df_tarefas['Data'], errors='coerce')
+        return {}
     
     # Verificar se há dados suficientes
     if df_tarefas.empty or df_tarefas['Data'].nunique() < 2:
         st.warning("Não há dados suficientes para exibir o filtro de datas.")
-        return df_tarefas
+        return {}
     
     # Definir min_date e max_date
     min_date = df_tarefas['Data'].min().to_pydatetime()
@@ -2309,25 +4383,13 @@ def filtros_atividades(df_tarefas):
         format="DD/MM/YYYY"
     )
     
-    # Aplicar os filtros
-    df_tarefas = df_tarefas[
-        (df_tarefas['Data'] >= data_inicio) & 
-        (df_tarefas['Data'] <= data_fim)
-    ]
-    
-    return df_tarefas
+    return {"Data": (data_inicio, data_fim)}
 
 # Função para filtros da aba Extras
 def filtros_extras(df_extras):
 
     st.sidebar.title("Filtros")
 
-    if df_extras.empty:
-        return df_extras
-
-    # Garantir que a coluna "Data" está em formato datetime
-    df_extras["Data"] = pd.to_datetime(df_extras["Data"], errors='coerce')
-
     # Definindo o intervalo de datas
     data_min = df_extras["Data"].min().date()  # Convertendo para date
     data_max = df_extras["Data"].max().date()  # Convertendo para date
@@ -2349,20 +4411,14 @@ def filtros_extras(df_extras):
     data_inicio = pd.to_datetime(data_inicio)
     data_fim = pd.to_datetime(data_fim)
 
-    # Filtrando o DataFrame com base nas datas selecionadas
-    df_extras = df_extras[(df_extras["Data"] >= data_inicio) & 
-                                   (df_extras["Data"] <= data_fim)]
-    
-    return df_extras
+    # Filtros aplicados às linhas e ao agregado com aplicar_filtros
+    return {"inicio": data_inicio, "fim": data_fim}
 
 # Função para filtros da aba Auditoria
 def filtros_auditoria(df_auditoria):
     st.sidebar.title("Filtros")
 
     # Filtro de Data - Mês e Ano
-    # Garantir que a coluna "Data" está em formato datetime
-    df_auditoria["Data"] = pd.to_datetime(df_auditoria["Data"], errors='coerce')
-
     # Extraindo ano e mês para um filtro de seleção
     df_auditoria['Ano_Mes'] = df_auditoria["Data"].dt.to_period('M')
 
@@ -2419,6 +4475,31 @@ def main_app():
 
     st.sidebar.markdown("---")  # Linha separadora
 
+    # Registros gravados localmente que ainda não chegaram ao Google Sheets
+    pendentes = get_outbox().pendentes()
+    if pendentes:
+        st.sidebar.caption(f"⏳ {pendentes} registro(s) aguardando envio ao Google Sheets")
+
+    # Uso da cota do Google Sheets no último minuto
+    uso_cota = get_controlador_cota().uso()
+    st.sidebar.caption(
+        f"Cota Google Sheets (último minuto): {uso_cota['leitura'][0]}/{uso_cota['leitura'][1]} leituras, "
+        f"{uso_cota['escrita'][0]}/{uso_cota['escrita'][1]} escritas"
+    )
+    if uso_cota["bloqueado_por"] > 0:
+        st.sidebar.caption(f"⏸️ Requisições suspensas por {uso_cota['bloqueado_por']:.0f} s após limite de cota")
+
+    # Pré-carregamento em segundo plano das abas uma vez por sessão
+    if "pre_carregamento_agendado" not in st.session_state:
+        get_pre_carregamento().agendar(list(SHEET_GIDS.keys()))
+        st.session_state["pre_carregamento_agendado"] = True
+
+    # Carregar (ou aguardar o pré-carregamento de) apenas as abas da página selecionada
+    dependencias = DEPENDENCIAS_PAGINAS.get(menu_option, [])
+    if dependencias:
+        with st.spinner('Carregando dados...'):
+            get_cache_dados().garantir(dependencias, tolerancia=TOLERANCIA_PAGINAS.get(menu_option))
+
     if menu_option == "Dashboard":
         dashboard()
     elif menu_option == "Registrar":
@@ -0,0 +1,150 @@
+"""
+Leitura e normalização de arquivos Excel de Pós-Aplicação.
+
+Módulo sem dependência do Streamlit, para que processar_arquivo_pos possa ser
+executada em processos separados (ProcessPoolExecutor) durante o upload de
+vários arquivos.
+"""
+import io
+import os
+import time
+
+import openpyxl
+import pandas as pd
+
+# Tamanho dos blocos de linhas lidos dos arquivos Excel de Pós-Aplicação
+TAMANHO_BLOCO_EXCEL = 5000
+
+# Mapeamento de possíveis nomes de colunas nos arquivos de Pós-Aplicação
+MAPEAMENTO_COLUNAS_POS = {
+    "DESC_OPERAÇÃO": ["desc_operação", "desc_operacao", "descricao_operacao", "descricao", "operacao", "operação", "desc operação", "desc operacao", "tipo operacao", "tipo_operacao", "tipo de operação", "tipo_operação"],
+    "DATA": ["data", "dt", "dt_operacao", "dt_operação", "data_operacao", "data_operação", "data operacao", "data operação", "date"],
+    "SETOR": ["setor", "num_setor", "numero_setor", "nº setor", "n° setor", "n setor", "setor_num", "setor numero", "numero do setor"],
+    "TALHÃO": ["talhão", "talhao", "talh", "num_talhao", "numero_talhao", "nº talhao", "n° talhao", "n talhao", "talhao_num", "talhao numero", "numero do talhao"],
+    "AREA": ["area", "área", "hectares", "ha", "tamanho", "tam", "area_ha", "área_ha", "area(ha)", "área(ha)"]
+}
+
+def encontrar_coluna(colunas, nomes_possiveis):
+    """
+    Encontra a coluna correspondente a um dos nomes possíveis.
+    
+    Returns:
+        int: Posição da coluna no cabeçalho ou None se não for encontrada
+    """
+    colunas_normalizadas = [str(col).lower().strip() if col is not None else "" for col in colunas]
+    for nome in nomes_possiveis:
+        if nome.lower().strip() in colunas_normalizadas:
+            return colunas_normalizadas.index(nome.lower().strip())
+    return None
+
+def _linhas_excel(arquivo):
+    """Gera as linhas (cabeçalho primeiro) da primeira planilha de um arquivo Excel."""
+    arquivo.seek(0)
+    if getattr(arquivo, "name", "").lower().endswith(".xls"):
+        # Formato .xls não é suportado pelo openpyxl: leitura completa do arquivo
+        df = pd.read_excel(arquivo, header=None, dtype=object)
+        df = df.astype(object).where(df.notna(), None)
+        yield from df.itertuples(index=False, name=None)
+        return
+    
+    # Leitura em fluxo: as linhas são lidas sob demanda, sem carregar o arquivo inteiro
+    workbook = openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def normalizar_bloco_pos(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte os tipos das colunas padronizadas de um bloco de Pós-Aplicação."""
+    df["DATA"] = pd.to_datetime(df["DATA"], errors="coerce").dt.strftime("%Y-%m-%d")
+    df = df.dropna(subset=["DATA"])
+    df["SETOR"] = pd.to_numeric(df["SETOR"], errors='coerce').fillna(0).astype(int)
+    df["AREA"] = pd.to_numeric(df["AREA"], errors='coerce').fillna(0)
+    # Textos como gravados na planilha e comparados na verificação de duplicatas
+    df["DESC_OPERAÇÃO"] = df["DESC_OPERAÇÃO"].astype(str).str.strip()
+    df["TALHÃO"] = df["TALHÃO"].astype(str).str.strip()
+    return df
+
+def ler_blocos_pos(arquivo, tamanho_bloco: int = TAMANHO_BLOCO_EXCEL):
+    """
+    Lê um arquivo Excel de Pós-Aplicação em blocos de linhas.
+    
+    As colunas são identificadas uma única vez pelo cabeçalho (MAPEAMENTO_COLUNAS_POS)
+    e cada bloco é entregue já com as colunas padronizadas e normalizado, de modo
+    que a memória usada não depende do tamanho do arquivo.
+    
+    Args:
+        arquivo: Arquivo Excel (.xlsx ou .xls)
+        tamanho_bloco: Quantidade de linhas por bloco
+        
+    Yields:
+        DataFrame com as colunas padronizadas de cada bloco
+        
+    Raises:
+        ValueError: Se alguma coluna obrigatória não for encontrada
+    """
+    linhas = _linhas_excel(arquivo)
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        return
+    
+    # Encontrar as colunas necessárias
+    posicoes = {}
+    colunas_nao_encontradas = []
+    for coluna_padrao, alternativas in MAPEAMENTO_COLUNAS_POS.items():
+        posicao = encontrar_coluna(cabecalho, [coluna_padrao] + alternativas)
+        if posicao is not None:
+            posicoes[coluna_padrao] = posicao
+        else:
+            colunas_nao_encontradas.append(coluna_padrao)
+    
+    if colunas_nao_encontradas:
+        raise ValueError(f"Não foi possível encontrar as seguintes colunas obrigatórias: {', '.join(colunas_nao_encontradas)}")
+    
+    bloco = []
+    for linha in linhas:
+        if all(valor is None for valor in linha):
+            continue  # Linha em branco
+        bloco.append([linha[posicao] if posicao < len(linha) else None for posicao in posicoes.values()])
+        if len(bloco) >= tamanho_bloco:
+            yield normalizar_bloco_pos(pd.DataFrame(bloco, columns=list(posicoes)))
+            bloco = []
+    if bloco:
+        yield normalizar_bloco_pos(pd.DataFrame(bloco, columns=list(posicoes)))
+
+def processar_arquivo_pos(nome_arquivo: str, conteudo: bytes, caminho_saida: str) -> dict:
+    """
+    Lê e normaliza um arquivo Excel de Pós-Aplicação, gravando os registros em CSV.
+    
+    Executada em um processo separado para cada arquivo enviado.
+    
+    Args:
+        nome_arquivo: Nome do arquivo enviado (define o formato, .xlsx ou .xls)
+        conteudo: Conteúdo do arquivo
+        caminho_saida: CSV em que os registros normalizados são gravados
+        
+    Returns:
+        dict: arquivo, caminho (None se não houver registros ou se a leitura falhou),
+              quantidade de registros, erro (None se a leitura foi concluída) e
+              duração em segundos
+    """
+    inicio = time.monotonic()
+    relatorio = {"arquivo": nome_arquivo, "caminho": None, "registros": 0, "erro": None, "duracao": 0.0}
+    
+    arquivo = io.BytesIO(conteudo)
+    arquivo.name = nome_arquivo
+    try:
+        for bloco in ler_blocos_pos(arquivo):
+            primeiro_bloco = relatorio["caminho"] is None
+            bloco.to_csv(caminho_saida, mode="w" if primeiro_bloco else "a", header=primeiro_bloco, index=False)
+            relatorio["caminho"] = caminho_saida
+            relatorio["registros"] += len(bloco)
+    except Exception as e:
+        # Um arquivo lido pela metade não é importado: descartar o CSV parcial
+        relatorio["erro"] = str(e)
+        if relatorio["caminho"] is not None:
+            os.remove(relatorio["caminho"])
+            relatorio["caminho"] = None
+    
+    relatorio["duracao"] = time.monotonic() - inicio
+    return relatorio